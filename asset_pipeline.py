@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Batch asset pipeline: run a chain of the image cleanup operations over many files.
+
+Usage:
+  python3 asset_pipeline.py "assets/portfolio/*.JPG" "assets/img/_INBOX/*"
+  python3 asset_pipeline.py assets/landing_mirror_oval.JPG --ops bg-remove,glow-strip,resize --scale 1.25
+
+Operations (applied in the order given by --ops):
+  bg-remove      rembg background removal (remove_bg_19.py / process_mirror.py)
+  glow-strip     drop semi-transparent glow (remove_glow.py)
+  outline-clean  drop bright outlines and low-alpha artifacts (cleanup_outlines.py)
+  red-clean      drop red reflections, deepen blacks (cleanup_mirror.py)
+  resize         scale by --scale and/or cap the long edge at --max-size
+  chroma-key     key out the corner background color (tools/strip_bg_glove.py)
+  edge-refine    premultiplied smoothing of the alpha edges only (edge_refine.py)
+
+Output:
+  <out-dir>/<source stem>.png for every input, plus per-image timings and throughput.
+  Two inputs with the same stem (x.jpg and x.png, a/x.png and b/x.png) are rejected up front.
+
+Notes:
+  - Images are fanned out over a process pool sized to the core count (--workers to override).
+  - bg-remove loads the rembg model once per worker (see bg_service.py).
+  - Outputs whose input and chain are unchanged are skipped (see build_cache.py; --force rebuilds).
+  - --optimize writes the PNGs through optimize_png.py (within --budget) instead of a plain save.
+  - Globs are expanded here, so quote them to keep the shell from doing it.
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from PIL import Image
+
+import bg_service
+from build_cache import BuildCache
+from cleanup_mirror import clean_red_reflections
+from cleanup_outlines import clean_outlines
+from edge_refine import EDGE_VERSION, refine_edges_image
+from optimize_png import BUDGET, save_png
+from remove_glow import strip_glow
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tools"))
+from strip_bg_glove import strip_bg_image  # noqa: E402
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp", ".tif", ".tiff"}
+DEFAULT_OPS = "bg-remove,glow-strip,outline-clean,resize"
+DEFAULT_OUT = "build/pipeline"
+
+Chain = List[Tuple[str, dict]]
+
+
+def resize(img: Image.Image, scale: float = 1.0, max_size: int | None = None) -> Image.Image:
+    w, h = img.size
+    if max_size:
+        scale = min(scale, max_size / max(w, h))
+    if scale == 1.0:
+        return img
+    return img.resize((int(w * scale), int(h * scale)), Image.Resampling.LANCZOS)
+
+
+OPS: Dict[str, Callable[..., Image.Image]] = {
+    "bg-remove": bg_service.remove_background,
+    "glow-strip": strip_glow,
+    "outline-clean": clean_outlines,
+    "red-clean": clean_red_reflections,
+    "resize": resize,
+    "chroma-key": strip_bg_image,
+    "edge-refine": refine_edges_image,
+}
+
+# Code revision of each operation, part of every cache key: bump an entry when a change
+# to that operation alters its output, so outputs built with the old code are rebuilt.
+OP_VERSIONS: Dict[str, object] = {
+    "bg-remove": 1,
+    "glow-strip": (1, EDGE_VERSION),
+    "outline-clean": (1, EDGE_VERSION),
+    "red-clean": (1, EDGE_VERSION),
+    "resize": 1,
+    "chroma-key": 1,
+    "edge-refine": EDGE_VERSION,
+}
+
+
+def chain_version(chain: Chain) -> List[object]:
+    """The OP_VERSIONS entry of every step, for BuildCache.key(version=...)."""
+    return [OP_VERSIONS[name] for name, _ in chain]
+
+
+def expand_inputs(patterns: List[str]) -> List[Path]:
+    """Expand files/globs into a sorted, de-duplicated list of image paths."""
+    seen: Dict[str, Path] = {}
+    for pat in patterns:
+        matches = glob.glob(pat) if glob.has_magic(pat) else [pat]
+        for m in matches:
+            p = Path(m)
+            if p.is_file() and p.suffix.lower() in IMAGE_EXTS:
+                seen.setdefault(str(p.resolve()), p)
+    return sorted(seen.values())
+
+
+def output_paths(sources: List[Path], out_dir: Path) -> List[Path]:
+    """<out_dir>/<stem>.png per source; two sources that would share an output are an error."""
+    claimed: Dict[str, Path] = {}
+    for src in sources:
+        other = claimed.setdefault(src.stem.casefold(), src)
+        if other is not src:
+            raise SystemExit(f"{other} and {src} would both be written to "
+                             f"{out_dir / (src.stem + '.png')}; rename one or run them separately")
+    return [out_dir / f"{src.stem}.png" for src in sources]
+
+
+def process_one(src: Path, out_path: Path, chain: Chain,
+                optimize: dict | None = None) -> Tuple[Path, float, int]:
+    """Run ``chain`` on one image and save it; returns (src, seconds, source pixel count)."""
+    t0 = time.perf_counter()
+    img = Image.open(src)
+    pixels = img.size[0] * img.size[1]
+    for name, params in chain:
+        img = OPS[name](img, **params)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    if optimize is not None:
+        save_png(img, out_path, **optimize)
+    else:
+        img.save(out_path, "PNG")
+    return src, time.perf_counter() - t0, pixels
+
+
+def run(sources: List[Path], out_dir: Path, chain: Chain, workers: int | None = None,
+        threads: int | None = None, force: bool = False, optimize: dict | None = None) -> None:
+    cache = BuildCache()
+    jobs = []
+    for src, out_path in zip(sources, output_paths(sources, out_dir)):
+        params = {"chain": chain, "optimize": optimize} if optimize else {"chain": chain}
+        key = cache.key(src, "asset_pipeline", params, version=chain_version(chain))
+        if force or not cache.is_fresh(out_path, key):
+            jobs.append((src, out_path, key))
+    skipped = len(sources) - len(jobs)
+    if not jobs:
+        cache.save()
+        print(f"All {skipped} image(s) up to date.")
+        return
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    pool_kwargs = {}
+    if any(name == "bg-remove" for name, _ in chain):
+        # Load the rembg model once per worker; split the cores between workers by default
+        threads = threads or max(1, (os.cpu_count() or 1) // workers)
+        pool_kwargs = {"initializer": bg_service.init_worker,
+                       "initargs": (bg_service.DEFAULT_MODEL, threads)}
+    print(f"Processing {len(jobs)} image(s) with {workers} worker(s), {skipped} up to date: "
+          f"{' → '.join(name for name, _ in chain)}")
+    t0 = time.perf_counter()
+    total_pixels = 0
+    with ProcessPoolExecutor(max_workers=workers, **pool_kwargs) as pool:
+        futures = {
+            pool.submit(process_one, src, out_path, chain, optimize): (src, out_path, key)
+            for src, out_path, key in jobs
+        }
+        for fut in as_completed(futures):
+            src, out_path, key = futures[fut]
+            try:
+                _, seconds, pixels = fut.result()
+            except Exception as e:
+                print(f"✗ {src}: {e}")
+                continue
+            cache.record(out_path, key)
+            total_pixels += pixels
+            print(f"✓ {src} ({seconds:.2f}s)")
+    cache.save()
+    wall = time.perf_counter() - t0
+    print("-" * 30)
+    print(f"{len(jobs)} image(s) in {wall:.2f}s — "
+          f"{len(jobs) / wall:.2f} img/s, {total_pixels / 1e6 / wall:.1f} MP/s")
+
+
+def build_chain(ops: str, scale: float, max_size: int | None) -> Chain:
+    chain: Chain = []
+    for name in (o.strip() for o in ops.split(",") if o.strip()):
+        if name not in OPS:
+            raise SystemExit(f"Unknown operation: {name} (choose from {', '.join(OPS)})")
+        params = {"scale": scale, "max_size": max_size} if name == "resize" else {}
+        chain.append((name, params))
+    return chain
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run image cleanup operations over many files.")
+    ap.add_argument("inputs", nargs="+", help="files or quoted globs")
+    ap.add_argument("--ops", default=DEFAULT_OPS, help=f"comma-separated chain (default: {DEFAULT_OPS})")
+    ap.add_argument("--scale", type=float, default=1.0, help="resize scale factor")
+    ap.add_argument("--max-size", type=int, default=None, help="resize cap for the long edge (px)")
+    ap.add_argument("--out-dir", default=DEFAULT_OUT, help=f"output folder (default: {DEFAULT_OUT})")
+    ap.add_argument("--workers", type=int, default=None, help="process count (default: CPU cores)")
+    ap.add_argument("--threads", type=int, default=None, help="rembg CPU threads per worker")
+    ap.add_argument("--force", action="store_true", help="ignore the build cache and rebuild everything")
+    ap.add_argument("--optimize", action="store_true", help="write optimized PNGs (optimize_png.py)")
+    ap.add_argument("--budget", type=float, default=BUDGET, help="perceptual error budget for --optimize")
+    args = ap.parse_args()
+
+    sources = expand_inputs(args.inputs)
+    if not sources:
+        print("No input images matched.")
+        return
+    chain = build_chain(args.ops, args.scale, args.max_size)
+    optimize = {"budget": args.budget} if args.optimize else None
+    run(sources, Path(args.out_dir), chain, args.workers, args.threads, args.force, optimize)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the cleanup mask kernels (remove_glow / cleanup_outlines / cleanup_mirror).
+
+Compares the fused in-place kernels against the original multi-pass versions
+(boolean masks per rule, fancy-indexed gathers/scatters), checks that both give
+identical arrays, and reports milliseconds per megapixel.
+
+Usage:
+  python3 bench_cleanup.py                      # random 12 MP RGBA image
+  python3 bench_cleanup.py --megapixels 4 --repeat 5
+  python3 bench_cleanup.py --image assets/landing_mirror_oval_no_bg_optimized.png
+"""
+import argparse
+import time
+
+from PIL import Image
+import numpy as np
+
+from cleanup_mirror import clean_red_reflections_array
+from cleanup_outlines import clean_outlines_array
+from remove_glow import strip_glow_array
+
+
+def legacy_glow(data):
+    red_channel = data[:, :, 0]
+    green_channel = data[:, :, 1]
+    blue_channel = data[:, :, 2]
+    alpha_channel = data[:, :, 3]
+    semi_transparent = (alpha_channel > 0) & (alpha_channel < 200)
+    bright_glow = ((red_channel > 150) | (green_channel > 150) | (blue_channel > 150)) & (alpha_channel < 100)
+    low_alpha_glow = alpha_channel < 50
+    glow_areas = semi_transparent | bright_glow | low_alpha_glow
+    data[glow_areas, 3] = 0
+    return data
+
+
+def legacy_outlines(data):
+    red_channel = data[:, :, 0]
+    green_channel = data[:, :, 1]
+    blue_channel = data[:, :, 2]
+    alpha_channel = data[:, :, 3]
+    bright_areas = ((red_channel > 200) | (green_channel > 200) | (blue_channel > 200)) & (alpha_channel < 150)
+    too_bright = (red_channel + green_channel + blue_channel) > 400
+    low_alpha_artifacts = (alpha_channel < 100) & ((red_channel > 100) | (green_channel > 100) | (blue_channel > 100))
+    artifacts = bright_areas | too_bright | low_alpha_artifacts
+    data[artifacts, 3] = 0
+    return data
+
+
+def legacy_mirror(data):
+    red_channel = data[:, :, 0]
+    green_channel = data[:, :, 1]
+    blue_channel = data[:, :, 2]
+    alpha_channel = data[:, :, 3]
+    red_mask = (red_channel > 100) & (red_channel > green_channel * 1.2) & (red_channel > blue_channel * 1.2) & (alpha_channel > 30)
+    reddish_areas = (red_channel > 80) & (red_channel > green_channel) & (red_channel > blue_channel) & (alpha_channel > 20)
+    dark_areas = (red_channel < 100) & (green_channel < 100) & (blue_channel < 100) & (alpha_channel > 50)
+    red_areas = red_mask | reddish_areas
+    data[red_areas, 3] = 0
+    data[dark_areas, 0] = np.minimum(data[dark_areas, 0], 30)
+    data[dark_areas, 1] = np.minimum(data[dark_areas, 1], 30)
+    data[dark_areas, 2] = np.minimum(data[dark_areas, 2], 30)
+    return data
+
+
+KERNELS = [
+    ("glow", legacy_glow, strip_glow_array),
+    ("outlines", legacy_outlines, clean_outlines_array),
+    ("mirror", legacy_mirror, clean_red_reflections_array),
+]
+
+
+def best_time(fn, src, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        data = src.copy()
+        t0 = time.perf_counter()
+        fn(data)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--image", help="RGBA source (default: random pixels)")
+    parser.add_argument("--megapixels", type=float, default=12.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.image:
+        src = np.array(Image.open(args.image).convert('RGBA'))
+    else:
+        side = int((args.megapixels * 1e6) ** 0.5)
+        src = np.random.default_rng(0).integers(0, 256, (side, side, 4), dtype=np.uint8)
+    mp = src.shape[0] * src.shape[1] / 1e6
+    print(f"{src.shape[1]}x{src.shape[0]} ({mp:.1f} MP), best of {args.repeat}")
+    print("-" * 50)
+    for name, legacy, fused in KERNELS:
+        same = np.array_equal(legacy(src.copy()), fused(src.copy()))
+        t_old = best_time(legacy, src, args.repeat) * 1000 / mp
+        t_new = best_time(fused, src, args.repeat) * 1000 / mp
+        print(f"{name:9s} {t_old:7.2f} → {t_new:6.2f} ms/MP  ({t_old / t_new:4.1f}x)  "
+              f"{'identical' if same else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Shared rembg background-removal service.
+
+rembg.remove(img) without a session loads the ONNX model on every call. This module
+creates one session per model per process (or per pool worker) and reuses it, so only
+the first image pays the model load.
+
+Usage:
+  from bg_service import remove_background, remove_many
+  out = remove_background(Image.open("assets/landing_mirror.JPG"))
+  for path, out in remove_many(paths, threads=4): ...
+
+  python3 bg_service.py assets/portfolio/001.JPG assets/portfolio/002.JPG [--threads 4]
+    (writes <stem>_no_bg.png next to each input and prints per-image latency)
+
+Notes:
+  - The thread count is applied through OMP_NUM_THREADS, which rembg reads when it
+    builds the onnxruntime session; it only takes effect before the first session.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Tuple
+
+from PIL import Image
+
+DEFAULT_MODEL = "u2net"
+
+_sessions: Dict[str, object] = {}
+
+
+def get_session(model: str = DEFAULT_MODEL, threads: int | None = None):
+    """Return this process's rembg session for ``model``, creating it on first use."""
+    if model not in _sessions:
+        if threads:
+            os.environ["OMP_NUM_THREADS"] = str(threads)
+        from rembg import new_session
+
+        _sessions[model] = new_session(model)
+    return _sessions[model]
+
+
+def init_worker(model: str = DEFAULT_MODEL, threads: int | None = None) -> None:
+    """ProcessPoolExecutor initializer: load the model once when the worker starts."""
+    get_session(model, threads)
+
+
+def remove_background(img: Image.Image, model: str = DEFAULT_MODEL) -> Image.Image:
+    from rembg import remove
+
+    return remove(img, session=get_session(model))
+
+
+def remove_many(paths: Iterable[Path], model: str = DEFAULT_MODEL,
+                threads: int | None = None) -> Iterator[Tuple[Path, Image.Image]]:
+    """Yield (path, RGBA image) for each path, sharing one session across the batch."""
+    get_session(model, threads)
+    for p in paths:
+        with Image.open(p) as img:
+            yield Path(p), remove_background(img, model)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Remove backgrounds from many images with one rembg session.")
+    ap.add_argument("inputs", nargs="+")
+    ap.add_argument("--model", default=DEFAULT_MODEL)
+    ap.add_argument("--threads", type=int, default=None, help="onnxruntime CPU threads")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    get_session(args.model, args.threads)
+    print(f"Model {args.model} loaded in {time.perf_counter() - t0:.2f}s")
+    t_prev = time.perf_counter()
+    for path, out in remove_many(args.inputs, args.model):
+        out_path = path.with_name(f"{path.stem}_no_bg.png")
+        out.save(out_path, "PNG")
+        now = time.perf_counter()
+        print(f"✓ {out_path} ({now - t_prev:.2f}s)")
+        t_prev = now
+
+
+if __name__ == "__main__":
+    main()
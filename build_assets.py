@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Build every asset declared in the asset manifest (assets.toml).
+
+Usage:
+  python3 build_assets.py                 # build what changed
+  python3 build_assets.py --dry-run       # show what would be built
+  python3 build_assets.py other.toml --force --workers 2
+
+How it works:
+  - Each [[asset]] is a node; an asset whose source is another asset's output depends
+    on it. The nodes form trees (one source per asset).
+  - Independent trees run concurrently in a process pool. Within a tree, a child is
+    built from its parent's in-memory image rather than re-decoding the PNG the
+    parent just wrote.
+  - An asset is rebuilt when its root source file, or any operation, parameter or
+    operation version (asset_pipeline.OP_VERSIONS) on the path from that source,
+    changed (build_cache.py), and everything below it follows.
+  - With an [optimize] table in the manifest, outputs are written by optimize_png.py
+    (palette quantization within the perceptual budget, filter/zlib search, no metadata)
+    instead of a plain PNG save. Children are still built from the full-quality image:
+    when a child is stale but its parent is fresh, a lossy (budget > 0) parent is
+    recomputed in memory from its source rather than read back from its palette PNG.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+import tomllib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+from PIL import Image
+
+import bg_service
+from asset_pipeline import OPS, Chain, chain_version
+from build_cache import BuildCache
+from optimize_png import BUDGET, save_png
+
+MANIFEST = Path("assets.toml")
+
+Assets = Dict[str, dict]
+
+
+def load_manifest(path: Path) -> Assets:
+    """Parse the manifest into {output: {"output", "source", "chain"}}."""
+    with open(path, "rb") as f:
+        entries = tomllib.load(f).get("asset", [])
+    assets: Assets = {}
+    for entry in entries:
+        output, source = entry.get("output"), entry.get("source")
+        if not output or not source:
+            raise SystemExit(f"{path}: every [[asset]] needs an output and a source")
+        if output in assets:
+            raise SystemExit(f"{path}: {output} is declared twice")
+        chain: Chain = []
+        for step in entry.get("ops", []):
+            params = dict(step)
+            name = params.pop("op", None)
+            if name not in OPS:
+                raise SystemExit(f"{path}: {output}: unknown operation {name!r} (choose from {', '.join(OPS)})")
+            chain.append((name, params))
+        assets[output] = {"output": output, "source": source, "chain": chain}
+    return assets
+
+
+def load_optimize(path: Path) -> dict | None:
+    """The manifest's [optimize] table (e.g. {"budget": 0.00015}), or None for plain saves."""
+    with open(path, "rb") as f:
+        table = tomllib.load(f).get("optimize")
+    if table is None or not table.pop("enabled", True):
+        return None
+    unknown = set(table) - {"budget"}
+    if unknown:
+        raise SystemExit(f"{path}: unknown [optimize] setting(s): {', '.join(sorted(unknown))}")
+    return table
+
+
+def build_graph(assets: Assets) -> Tuple[List[str], Dict[str, List[str]]]:
+    """Return (roots, children) for the dependency forest; rejects cycles."""
+    children: Dict[str, List[str]] = {name: [] for name in assets}
+    roots: List[str] = []
+    for name, node in assets.items():
+        seen = {name}
+        parent = node["source"]
+        while parent in assets:
+            if parent in seen:
+                raise SystemExit(f"Dependency cycle through {name}")
+            seen.add(parent)
+            parent = assets[parent]["source"]
+        if node["source"] in assets:
+            children[node["source"]].append(name)
+        else:
+            roots.append(name)
+    return roots, children
+
+
+def lineage(assets: Assets, name: str) -> Tuple[str, List[Chain]]:
+    """Return (root source file, chains from the root down to ``name``)."""
+    chains: List[Chain] = []
+    while name in assets:
+        chains.append(assets[name]["chain"])
+        name = assets[name]["source"]
+    return name, chains[::-1]
+
+
+def plan(assets: Assets, roots: List[str], children: Dict[str, List[str]], cache: BuildCache,
+         force: bool, optimize: dict | None = None) -> Tuple[Set[str], Set[str], Dict[str, str], List[str]]:
+    """Decide what to build.
+
+    Returns (stale, needed, keys, missing): stale assets must be rebuilt; needed
+    assets are stale or an ancestor of one (so their image is required).
+    Assets below a missing source file get no key and are not built.
+    """
+    stale: Set[str] = set()
+    keys: Dict[str, str] = {}
+    missing: List[str] = []
+
+    def visit(name: str, parent_stale: bool) -> None:
+        src, chains = lineage(assets, name)
+        if not Path(src).exists():
+            missing.append(src)
+            return
+        params = {"chains": chains, "optimize": optimize} if optimize else {"chains": chains}
+        keys[name] = cache.key(src, "build_assets", params, version=[chain_version(c) for c in chains])
+        is_stale = force or parent_stale or not cache.is_fresh(name, keys[name])
+        if is_stale:
+            stale.add(name)
+        for child in children[name]:
+            visit(child, is_stale)
+
+    for root in roots:
+        visit(root, False)
+    needed: Set[str] = set()
+    for name in stale:
+        while name in assets and name not in needed:
+            needed.add(name)
+            name = assets[name]["source"]
+    return stale, needed, keys, missing
+
+
+def build_tree(root: str, assets: Assets, children: Dict[str, List[str]], stale: Set[str],
+               needed: Set[str], optimize: dict | None = None) -> List[Tuple[str, float, str | None]]:
+    """Build one dependency tree in this process; returns (output, seconds, error) per built asset."""
+    results: List[Tuple[str, float, str | None]] = []
+    # A lossy output on disk isn't the image its chain produced; children need the latter
+    lossy = optimize is not None and optimize.get("budget", BUDGET) > 0
+
+    def run_chain(node: dict, parent_img: Image.Image | None) -> Image.Image:
+        img = parent_img if parent_img is not None else Image.open(node["source"])
+        for op, params in node["chain"]:
+            img = OPS[op](img, **params)
+        return img
+
+    def visit(name: str, parent_img: Image.Image | None) -> None:
+        node = assets[name]
+        img = None
+        if name in stale:
+            t0 = time.perf_counter()
+            try:
+                img = run_chain(node, parent_img)
+                Path(name).parent.mkdir(parents=True, exist_ok=True)
+                if optimize is not None:
+                    save_png(img, name, **optimize)
+                else:
+                    img.save(name, "PNG")
+            except Exception as e:
+                results.append((name, time.perf_counter() - t0, str(e)))
+                return  # nothing below a failed asset can be built
+            results.append((name, time.perf_counter() - t0, None))
+        kids = [c for c in children[name] if c in needed]
+        if kids and img is None:
+            # Fresh on disk, but a child needs it
+            if lossy:
+                t0 = time.perf_counter()
+                try:
+                    img = run_chain(node, parent_img)
+                except Exception as e:
+                    results.append((name, time.perf_counter() - t0, f"recomputing for its children: {e}"))
+                    return
+            else:
+                img = Image.open(name)
+                img.load()
+        for child in kids:
+            visit(child, img)
+
+    visit(root, None)
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build the assets declared in the asset manifest.")
+    ap.add_argument("manifest", nargs="?", default=str(MANIFEST))
+    ap.add_argument("--workers", type=int, default=None, help="process count (default: CPU cores)")
+    ap.add_argument("--force", action="store_true", help="rebuild everything")
+    ap.add_argument("--dry-run", action="store_true", help="only print the plan")
+    args = ap.parse_args()
+
+    assets = load_manifest(Path(args.manifest))
+    optimize = load_optimize(Path(args.manifest))
+    roots, children = build_graph(assets)
+    cache = BuildCache()
+    stale, needed, keys, missing = plan(assets, roots, children, cache, args.force, optimize)
+    for src in missing:
+        print(f"✗ missing source: {src}")
+    todo = [root for root in roots if root in needed]
+    print(f"{len(assets)} asset(s): {len(stale)} to build, {len(keys) - len(stale)} up to date, "
+          f"{len(assets) - len(keys)} blocked, {len(todo)} independent tree(s)")
+    if args.dry_run or not todo:
+        for name in assets:
+            if name in stale:
+                print(f"  build  {name}")
+        cache.save()
+        return
+
+    workers = min(args.workers or os.cpu_count() or 1, len(todo))
+    pool_kwargs = {}
+    if any(op == "bg-remove" for name in stale for op, _ in assets[name]["chain"]):
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        pool_kwargs = {"initializer": bg_service.init_worker,
+                       "initargs": (bg_service.DEFAULT_MODEL, threads)}
+    t0 = time.perf_counter()
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers, **pool_kwargs) as pool:
+        futures = [pool.submit(build_tree, root, assets, children, stale, needed, optimize) for root in todo]
+        for fut in as_completed(futures):
+            for name, seconds, error in fut.result():
+                if error:
+                    failed += 1
+                    print(f"✗ {name}: {error}")
+                    continue
+                cache.record(name, keys[name])
+                print(f"✓ {name} ({seconds:.2f}s, {Path(name).stat().st_size / 1024:.0f} KB)")
+    cache.save()
+    print("-" * 30)
+    print(f"Done in {time.perf_counter() - t0:.2f}s" + (f", {failed} failed" if failed else ""))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Content-hash build cache for the asset scripts.
+
+Each output is recorded in a local manifest (.build-cache.json) under a key made of
+the SHA-256 of its input file(s), the operation name, the operation parameters and
+the operation's version. A script asks the cache whether its output is fresh before
+doing any work, so re-runs over unchanged inputs are skipped, while changing a single
+parameter (e.g. the collar scale) only rebuilds the outputs that depend on it.
+
+The cache can't see code, so a script whose algorithm changes the pixels it writes
+must bump the version it passes to key(); otherwise old outputs stay "fresh".
+
+Usage:
+  cache = BuildCache()
+  key = cache.key("assets/landing_collar_clean.JPG", "cleanup_collar", {"scale": 1.3915}, version=1)
+  if not cache.is_fresh("assets/landing_collar_no_bg.png", key):
+      ...build...
+      cache.record("assets/landing_collar_no_bg.png", key)
+      cache.save()
+
+  python3 build_cache.py            # list cached outputs and whether they are fresh
+  python3 build_cache.py --clear    # forget everything (next run rebuilds all)
+
+Notes:
+  - Input hashes are memoized by (size, mtime), so unchanged files are not re-read.
+  - An output is stale if it is missing on disk, even when the key matches.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Iterable
+
+MANIFEST = Path(".build-cache.json")
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class BuildCache:
+    def __init__(self, manifest: Path | str = MANIFEST):
+        self.path = Path(manifest)
+        self.data = {"inputs": {}, "outputs": {}}
+        if self.path.exists():
+            try:
+                self.data = json.loads(self.path.read_text())
+            except (OSError, ValueError):
+                pass  # corrupt manifest: start over
+        self.dirty = False
+
+    def input_hash(self, path: Path | str) -> str:
+        """SHA-256 of ``path``, reusing the stored hash while size and mtime are unchanged."""
+        p = Path(path)
+        st = p.stat()
+        entry = self.data["inputs"].get(str(p))
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return entry["sha256"]
+        digest = file_sha256(p)
+        self.data["inputs"][str(p)] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+        self.dirty = True
+        return digest
+
+    def key(self, inputs: Path | str | Iterable[Path | str], op: str, params: dict | None = None,
+            version: object = None) -> str:
+        """Cache key for an output; ``version`` identifies the code revision of ``op``."""
+        if isinstance(inputs, (str, Path)):
+            inputs = [inputs]
+        payload = {
+            "inputs": [self.input_hash(p) for p in inputs],
+            "op": op,
+            "params": params or {},
+        }
+        if version is not None:
+            payload["version"] = version
+        blob = json.dumps(payload, sort_keys=True, default=str).encode()
+        return hashlib.sha256(blob).hexdigest()
+
+    def is_fresh(self, output: Path | str, key: str) -> bool:
+        return self.data["outputs"].get(str(output)) == key and Path(output).exists()
+
+    def record(self, output: Path | str, key: str) -> None:
+        self.data["outputs"][str(output)] = key
+        self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.data, indent=1, sort_keys=True))
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+def main():
+    if "--clear" in sys.argv[1:]:
+        if MANIFEST.exists():
+            MANIFEST.unlink()
+        print(f"Cleared {MANIFEST}")
+        return
+    cache = BuildCache()
+    outputs = cache.data["outputs"]
+    if not outputs:
+        print("Build cache is empty.")
+        return
+    for out in sorted(outputs):
+        state = "cached " if Path(out).exists() else "missing"
+        print(f"{state}  {out}")
+
+
+if __name__ == "__main__":
+    main()
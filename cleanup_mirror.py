@@ -3,57 +3,96 @@
 Clean up red reflections and dots from the black areas of the mirror image
 """
 
-from PIL import Image, ImageFilter
+import argparse
+
+from PIL import Image
 import numpy as np
 
-def cleanup_red_reflections():
-    input_path = "assets/landing_mirror_clean.png"
-    output_path = "assets/landing_mirror_cleaner.png"
-    
-    # Open the image
-    img = Image.open(input_path)
-    img = img.convert('RGBA')
-    
-    # Convert to numpy array for easier manipulation
-    data = np.array(img)
-    
-    # Create a mask for red areas (more aggressive)
+from build_cache import BuildCache
+from edge_refine import edge_params, refine_edges
+from tiling import STRIP_ROWS, process_tiled
+
+BLUR_RADIUS = 1.0
+
+# Per-pixel RGBA caps packed as one uint32 each (built from bytes, so byte order
+# doesn't matter). A single np.minimum against the cap plane applies both rules.
+KEEP = np.array([255, 255, 255, 255], dtype=np.uint8).view(np.uint32)[0]
+CLEAR_ALPHA = np.array([255, 255, 255, 0], dtype=np.uint8).view(np.uint32)[0]
+
+CACHE_VERSION = 1  # bump when a change to the red/dark rule alters the output
+
+def clean_red_reflections_array(data, red_min=80, red_alpha=20, dark_max=100, dark_alpha=50, dark_cap=30):
+    """Apply the red/dark rule in place to an RGBA uint8 array"""
     red_channel = data[:, :, 0]
-    green_channel = data[:, :, 1]
-    blue_channel = data[:, :, 2]
     alpha_channel = data[:, :, 3]
     
-    # More aggressive red detection
-    red_mask = (red_channel > 100) & (red_channel > green_channel * 1.2) & (red_channel > blue_channel * 1.2) & (alpha_channel > 30)
+    # Brightest of green/blue, shared by both rules
+    green_blue = np.maximum(data[:, :, 1], data[:, :, 2])
     
-    # Find any reddish areas (lower threshold)
-    reddish_areas = (red_channel > 80) & (red_channel > green_channel) & (red_channel > blue_channel) & (alpha_channel > 20)
+    # Reddish areas: red beats red_min, green and blue. The stricter "red > 1.2 x green/blue"
+    # mask is a subset of this one, so it doesn't change the union.
+    red_areas = red_channel > np.maximum(green_blue, red_min)
+    red_areas &= alpha_channel > red_alpha
     
-    # Find dark areas that should be blacker
-    dark_areas = (red_channel < 100) & (green_channel < 100) & (blue_channel < 100) & (alpha_channel > 50)
+    # Dark areas (all channels < dark_max), judged on the original alpha
+    dark_areas = np.maximum(red_channel, green_blue, out=green_blue) < dark_max
+    dark_areas &= alpha_channel > dark_alpha
     
-    # Combine masks
-    red_areas = red_mask | reddish_areas
+    # Dark areas get RGB capped at dark_cap, red areas get alpha capped at 0
+    dark = np.array([dark_cap, dark_cap, dark_cap, 255], dtype=np.uint8).view(np.uint32)[0]
+    caps = np.where(dark_areas, dark, KEEP)
+    np.bitwise_and(caps, CLEAR_ALPHA, out=caps, where=red_areas)
     
-    # Set red areas to transparent
-    data[red_areas, 3] = 0  # Set alpha to 0 for red areas
+    # One contiguous pass over the pixels, no boolean-indexed copies
+    np.minimum(data, caps.view(np.uint8).reshape(data.shape), out=data)
+    
+    return data
+
+def clean_red_reflections(img, red_min=80, red_alpha=20, dark_max=100, dark_alpha=50, dark_cap=30,
+                          blur=BLUR_RADIUS):
+    """Return a copy of img with red reflections removed and dark areas deepened"""
+    data = clean_red_reflections_array(np.array(img.convert('RGBA')),
+                                       red_min, red_alpha, dark_max, dark_alpha, dark_cap)
     
-    # Make dark areas blacker
-    data[dark_areas, 0] = np.minimum(data[dark_areas, 0], 30)  # Reduce red
-    data[dark_areas, 1] = np.minimum(data[dark_areas, 1], 30)  # Reduce green
-    data[dark_areas, 2] = np.minimum(data[dark_areas, 2], 30)  # Reduce blue
+    # Smooth the rims of the cleared red areas (edge band, premultiplied)
+    refine_edges(data, blur)
     
     # Create new image from cleaned data
     cleaned_img = Image.fromarray(data)
     
-    # Apply a stronger blur to smooth artifacts
-    cleaned_img = cleaned_img.filter(ImageFilter.GaussianBlur(radius=1.0))
+    return cleaned_img
+
+def cleanup_red_reflections(tiled=False, strip_rows=STRIP_ROWS):
+    input_path = "assets/landing_mirror_clean.png"
+    output_path = "assets/landing_mirror_cleaner.png"
+    
+    # Skip if the input hasn't changed since the last run
+    cache = BuildCache()
+    key = cache.key(input_path, "cleanup_mirror",
+                    {"red_min": 80, "red_alpha": 20, "dark_max": 100, "dark_alpha": 50, "dark_cap": 30,
+                     **edge_params(BLUR_RADIUS)},
+                    version=CACHE_VERSION)
+    if cache.is_fresh(output_path, key):
+        print(f"{output_path} is up to date.")
+        return
     
-    # Save the result
-    cleaned_img.save(output_path, "PNG")
+    if tiled:
+        # Same pixels, but processed and written in row strips to bound memory
+        process_tiled(input_path, output_path, clean_red_reflections_array, BLUR_RADIUS, strip_rows)
+    else:
+        cleaned_img = clean_red_reflections(Image.open(input_path))
+        
+        # Save the result
+        cleaned_img.save(output_path, "PNG")
+    cache.record(output_path, key)
+    cache.save()
     
     print(f"More aggressive red cleanup and black enhancement! Saved as {output_path}")
     print("You can now update the landing page to use this cleaner version.")
 
 if __name__ == "__main__":
-    cleanup_red_reflections()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tiled", action="store_true", help="process in row strips (peak memory about one decoded copy)")
+    parser.add_argument("--strip-rows", type=int, default=STRIP_ROWS)
+    args = parser.parse_args()
+    cleanup_red_reflections(args.tiled, args.strip_rows)
@@ -3,51 +3,89 @@
 Remove bright outlines and artifacts from the collar image
 """
 
-from PIL import Image, ImageFilter
+import argparse
+
+from PIL import Image
 import numpy as np
 
-def cleanup_outlines():
-    input_path = "assets/landing_collar_no_bg.png"
-    output_path = "assets/landing_collar_clean_edges.png"
-    
-    # Open the image
-    img = Image.open(input_path)
-    img = img.convert('RGBA')
-    
-    # Convert to numpy array for easier manipulation
-    data = np.array(img)
+from build_cache import BuildCache
+from edge_refine import edge_params, refine_edges
+from tiling import STRIP_ROWS, process_tiled
+
+BLUR_RADIUS = 0.3
+
+def artifact_thresholds(bright=200, bright_alpha=150, faint=100, faint_alpha=100):
+    """Brightest-channel threshold above which a pixel is an artifact, per alpha value.
     
-    # Get color channels
-    red_channel = data[:, :, 0]
-    green_channel = data[:, :, 1]
-    blue_channel = data[:, :, 2]
+    Bright areas: any channel > bright with alpha < bright_alpha.
+    Low-alpha artifacts: any channel > faint with alpha < faint_alpha.
+    255 means "never" (no uint8 channel exceeds it).
+    """
+    thresholds = np.full(256, 255, dtype=np.uint8)
+    thresholds[:bright_alpha] = np.minimum(thresholds[:bright_alpha], bright)
+    thresholds[:faint_alpha] = np.minimum(thresholds[:faint_alpha], faint)
+    return thresholds
+
+ARTIFACT_THRESHOLD = artifact_thresholds()
+CACHE_VERSION = 1  # bump when a change to the artifact rule alters the output
+
+def clean_outlines_array(data, thresholds=ARTIFACT_THRESHOLD):
+    """Apply the outline/artifact rule in place to an RGBA uint8 array"""
     alpha_channel = data[:, :, 3]
     
-    # Find bright areas (high values in any channel) with low alpha
-    bright_areas = ((red_channel > 200) | (green_channel > 200) | (blue_channel > 200)) & (alpha_channel < 150)
-    
-    # Find areas that are too bright overall (likely artifacts)
-    too_bright = (red_channel + green_channel + blue_channel) > 400
+    # Brightest channel per pixel (one uint8 temporary, no boolean-indexed copies)
+    brightest = np.maximum(data[:, :, 0], data[:, :, 1])
+    np.maximum(brightest, data[:, :, 2], out=brightest)
     
-    # Find areas with low alpha that might be artifacts
-    low_alpha_artifacts = (alpha_channel < 100) & ((red_channel > 100) | (green_channel > 100) | (blue_channel > 100))
+    # Set artifact areas to completely transparent. The old "too bright overall"
+    # rule, (r + g + b) > 400, summed uint8 channels and wrapped, so it never fired;
+    # it is left out to keep the output identical.
+    np.multiply(alpha_channel, brightest <= thresholds[alpha_channel], out=alpha_channel)
     
-    # Combine all artifact masks
-    artifacts = bright_areas | too_bright | low_alpha_artifacts
+    return data
+
+def clean_outlines(img, bright=200, bright_alpha=150, faint=100, faint_alpha=100, blur=BLUR_RADIUS):
+    """Return a copy of img with bright outlines and low-alpha artifacts removed"""
+    thresholds = artifact_thresholds(bright, bright_alpha, faint, faint_alpha)
+    data = clean_outlines_array(np.array(img.convert('RGBA')), thresholds)
     
-    # Set artifact areas to completely transparent
-    data[artifacts, 3] = 0
+    # Soften the edges left by the artifact cut; the interior is left as is
+    refine_edges(data, blur)
     
     # Create new image from cleaned data
     cleaned_img = Image.fromarray(data)
     
-    # Apply a very slight blur to smooth any remaining edge artifacts
-    cleaned_img = cleaned_img.filter(ImageFilter.GaussianBlur(radius=0.3))
+    return cleaned_img
+
+def cleanup_outlines(tiled=False, strip_rows=STRIP_ROWS):
+    input_path = "assets/landing_collar_no_bg.png"
+    output_path = "assets/landing_collar_clean_edges.png"
+    
+    # Skip if the input hasn't changed since the last run
+    cache = BuildCache()
+    key = cache.key(input_path, "cleanup_outlines",
+                    {"thresholds": ARTIFACT_THRESHOLD.tolist(), **edge_params(BLUR_RADIUS)},
+                    version=CACHE_VERSION)
+    if cache.is_fresh(output_path, key):
+        print(f"{output_path} is up to date.")
+        return
     
-    # Save the result
-    cleaned_img.save(output_path, "PNG")
+    if tiled:
+        # Same pixels, but processed and written in row strips to bound memory
+        process_tiled(input_path, output_path, clean_outlines_array, BLUR_RADIUS, strip_rows)
+    else:
+        cleaned_img = clean_outlines(Image.open(input_path))
+        
+        # Save the result
+        cleaned_img.save(output_path, "PNG")
+    cache.record(output_path, key)
+    cache.save()
     
     print(f"Bright outlines and artifacts removed! Saved as {output_path}")
 
 if __name__ == "__main__":
-    cleanup_outlines()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tiled", action="store_true", help="process in row strips (peak memory about one decoded copy)")
+    parser.add_argument("--strip-rows", type=int, default=STRIP_ROWS)
+    args = parser.parse_args()
+    cleanup_outlines(args.tiled, args.strip_rows)
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Lossless / near-lossless PNG optimizer for the generated transparent assets.
+
+This is an output stage: it writes optimized copies to build/png/ (--out-dir), and
+build_assets.py (an [optimize] table in assets.toml) and asset_pipeline.py (--optimize)
+use it to write their outputs. Committed source
+art stays untouched; rewriting files in place is opt-in (--in-place) because a lossy
+result can't be undone.
+
+Usage:
+  python3 optimize_png.py "assets/**/*.png" --dry-run            # only report the savings
+  python3 optimize_png.py build/pipeline/*.png --out-dir dist/png  # optimized copies
+  python3 optimize_png.py hero.png --budget 0 --in-place           # lossless, overwrite
+
+Per image, every candidate encoding is tried and the smallest one kept:
+  - lossless reductions: RGBA with no transparency -> RGB, gray RGB -> L, and an exact
+    palette when the image has at most 256 distinct colors;
+  - palette quantization (256/128/64 colors, transparency kept in tRNS), only when the
+    perceptual error stays within --budget: the 99th percentile, over the visible
+    pixels, of the per-pixel YIQ delta (screenshot_diff.py's metric) between 5x5
+    box-blurred copies of the original and the candidate, composited over black and
+    over white so that changes in alpha count as well. The blur forgives noise-level
+    differences in textured art but not banding in smooth gradients (the default
+    rejects the mirror, keeps the home icon);
+  - each candidate is written by a small PNG encoder: all five row filters are computed
+    as whole-array NumPy operations and tried as fixed filters plus the per-row
+    "minimum sum of absolute differences" choice, the best one is then compressed at
+    several zlib levels and strategies;
+  - only IHDR/PLTE/tRNS/IDAT/IEND are written, plus the color-management chunks
+    (iCCP/sRGB/gAMA) when present; text, EXIF, time and pHYs metadata is dropped.
+The re-encoded file is only written when it is smaller; otherwise the original bytes
+are. Images the 8-bit encoder can't reproduce exactly (16-bit PNGs, I/I;16/F and other
+modes) are kept as they are. Files are processed in a process pool; a bytes-saved
+report is printed at the end.
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+from PIL import Image
+
+from screenshot_diff import yiq_delta
+
+BUDGET = 0.00015  # 99th-percentile low-pass YIQ delta allowed for lossy (palette) candidates
+PERCENTILE = 99
+BLUR_RADIUS = 2  # 5x5 box
+PALETTE_SIZES = (256, 128, 64)
+LEVELS = (9, 8)
+STRATEGIES = (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED, zlib.Z_RLE)
+PNG_SIG = b"\x89PNG\r\n\x1a\n"
+DEFAULT_OUT = "build/png"
+COLOR_TYPES = {"L": (0, 1), "RGB": (2, 3), "P": (3, 1), "LA": (4, 2), "RGBA": (6, 4)}  # (type, bytes/px)
+FILTER_NAMES = ["none", "sub", "up", "average", "paeth", "adaptive"]
+EXACT_MODES = {"1", "L", "LA", "P", "PA", "RGB", "RGBA"}  # 8-bit, convert to RGBA without loss
+
+
+def _chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+
+def filter_rows(raw: np.ndarray, bpp: int) -> np.ndarray:
+    """All five PNG filters of an (h, stride) uint8 scanline array, shape (5, h, stride)."""
+    x = raw.astype(np.int16)
+    a = np.zeros_like(x)
+    a[:, bpp:] = x[:, :-bpp]
+    b = np.zeros_like(x)
+    b[1:] = x[:-1]
+    c = np.zeros_like(x)
+    c[1:, bpp:] = x[:-1, :-bpp]
+    p = a + b - c
+    pa, pb, pc = np.abs(p - a), np.abs(p - b), np.abs(p - c)
+    paeth = np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+    out = np.stack([x, x - a, x - b, x - ((a + b) >> 1), x - paeth])
+    return (out & 0xFF).astype(np.uint8)
+
+
+def filtered_streams(raw: np.ndarray, bpp: int) -> Dict[str, bytes]:
+    """Serialized scanlines (filter byte + data) for each fixed filter and the adaptive choice."""
+    f = filter_rows(raw, bpp)
+    h = raw.shape[0]
+    streams = {}
+    for k in range(5):
+        streams[FILTER_NAMES[k]] = np.hstack([np.full((h, 1), k, np.uint8), f[k]]).tobytes()
+    # libpng's heuristic: per row, the filter whose bytes (as signed) have the least |sum|
+    signed = f.view(np.int8).astype(np.int16)
+    best = np.abs(signed).sum(axis=2).argmin(axis=0)
+    rows = f[best, np.arange(h)]
+    streams["adaptive"] = np.hstack([best.astype(np.uint8)[:, None], rows]).tobytes()
+    return streams
+
+
+def compress_best(streams: Dict[str, bytes]) -> Tuple[bytes, str]:
+    """Smallest zlib stream: rank the filters with a quick pass, then search level/strategy."""
+    ranked = sorted(streams, key=lambda k: len(zlib.compress(streams[k], 6)))  # cheap ranking pass
+    best: Tuple[bytes, str] | None = None
+    for name in ranked[:2]:
+        for level in LEVELS:
+            for strategy in STRATEGIES:
+                c = zlib.compressobj(level, zlib.DEFLATED, 15, 9, strategy)
+                data = c.compress(streams[name]) + c.flush()
+                if best is None or len(data) < len(best[0]):
+                    best = (data, f"{name}, zlib {level}/{strategy}")
+    assert best is not None
+    return best
+
+
+def encode_png(img: Image.Image, info: dict | None = None) -> Tuple[bytes, str]:
+    """PNG bytes for an 8-bit L/RGB/P/LA/RGBA image, with the filter/zlib search applied."""
+    color_type, bpp = COLOR_TYPES[img.mode]
+    w, h = img.size
+    arr = np.asarray(img).reshape(h, w * bpp)
+    out = [PNG_SIG, _chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, color_type, 0, 0, 0))]
+    info = info or {}
+    if info.get("icc_profile"):
+        out.append(_chunk(b"iCCP", b"ICC Profile\x00\x00" + zlib.compress(info["icc_profile"], 9)))
+    elif "srgb" in info:
+        out.append(_chunk(b"sRGB", bytes([int(info["srgb"])])))
+    if "gamma" in info and not info.get("icc_profile"):
+        out.append(_chunk(b"gAMA", struct.pack(">I", int(round(info["gamma"] * 100000)))))
+    if img.mode == "P":
+        pal = img.getpalette("RGBA") or []
+        n = max(int(arr.max()) + 1, 1)
+        rgba = np.array(pal[:n * 4], dtype=np.uint8).reshape(-1, 4)
+        out.append(_chunk(b"PLTE", rgba[:, :3].tobytes()))
+        opaque = np.nonzero(rgba[:, 3] < 255)[0]
+        if opaque.size:
+            out.append(_chunk(b"tRNS", rgba[:opaque[-1] + 1, 3].tobytes()))
+    data, how = compress_best(filtered_streams(arr, bpp))
+    out += [_chunk(b"IDAT", data), _chunk(b"IEND", b"")]
+    return b"".join(out), how
+
+
+def _palette_image(index: np.ndarray, palette: np.ndarray) -> Image.Image:
+    """P image from an index array and an (n, 4) RGBA palette, transparent entries first
+    (so tRNS stays as short as possible)."""
+    order = np.lexsort((np.arange(len(palette)), palette[:, 3] == 255))
+    lut = np.empty(len(palette), dtype=np.uint8)
+    lut[order] = np.arange(len(palette), dtype=np.uint8)
+    img = Image.fromarray(lut[index], "P")
+    img.putpalette(palette[order].ravel().tolist(), "RGBA")
+    return img
+
+
+def exact_palette(rgba: np.ndarray) -> Image.Image | None:
+    """Lossless P image when there are at most 256 distinct RGBA colors."""
+    packed = rgba.reshape(-1, 4).view(np.uint32).ravel()
+    colors, index = np.unique(packed, return_inverse=True)
+    if len(colors) > 256:
+        return None
+    palette = colors.view(np.uint8).reshape(-1, 4)
+    return _palette_image(index.reshape(rgba.shape[:2]).astype(np.uint8), palette)
+
+
+def quantized(img: Image.Image, colors: int) -> Image.Image:
+    """Palette image with ``colors`` entries (alpha kept per entry)."""
+    if img.mode == "RGBA":
+        q = img.quantize(colors, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.FLOYDSTEINBERG)
+    else:
+        q = img.convert("RGB").quantize(colors, method=Image.Quantize.MEDIANCUT,
+                                        dither=Image.Dither.FLOYDSTEINBERG)
+    pal = np.array(q.getpalette("RGBA") or [], dtype=np.uint8).reshape(-1, 4)
+    return _palette_image(np.asarray(q), pal)
+
+
+def _box_blur(x: np.ndarray, r: int) -> np.ndarray:
+    """(2r+1)^2 box mean of an (H, W, C) float array, edges clamped (cumulative sums)."""
+    for axis in (0, 1):
+        pad = [(r + 1, r) if i == axis else (0, 0) for i in range(x.ndim)]
+        c = np.cumsum(np.pad(x, pad, mode="edge"), axis=axis, dtype=np.float64)
+        n = x.shape[axis]
+        x = (np.take(c, np.arange(2 * r + 1, 2 * r + 1 + n), axis=axis) - np.take(c, np.arange(n), axis=axis)) / (2 * r + 1)
+    return x
+
+
+def perceptual_error(ref: np.ndarray, img: Image.Image) -> float:
+    """Low-pass YIQ error between (H, W, 4) RGBA ``ref`` and ``img``, over black and white.
+
+    Both are box-blurred before comparing: pixel noise and texture mask small palette
+    errors, while banding in smooth gradients (a low-frequency error) survives the blur.
+    The percentile is taken over pixels visible in either image, so a mostly transparent
+    canvas can't dilute the error of the subject.
+    """
+    cand = np.asarray(img.convert("RGBA"), dtype=np.float32)
+    ref = ref.astype(np.float32)
+    visible = (ref[:, :, 3] > 0) | (cand[:, :, 3] > 0)
+    if not visible.any():
+        return 0.0
+    worst = 0.0
+    for bg in (0.0, 255.0):
+        a = ref[:, :, :3] * ref[:, :, 3:] / 255 + bg * (1 - ref[:, :, 3:] / 255)
+        b = cand[:, :, :3] * cand[:, :, 3:] / 255 + bg * (1 - cand[:, :, 3:] / 255)
+        delta = yiq_delta(_box_blur(a, BLUR_RADIUS), _box_blur(b, BLUR_RADIUS))
+        worst = max(worst, float(np.percentile(delta[visible], PERCENTILE)))
+    return worst
+
+
+def candidates(img: Image.Image, budget: float) -> List[Tuple[str, Image.Image]]:
+    """(label, image) encodings worth trying, all within the error budget."""
+    rgba_img = img.convert("RGBA")
+    rgba = np.asarray(rgba_img)
+    opaque = bool((rgba[:, :, 3] == 255).all())
+    gray = bool((rgba[:, :, 0] == rgba[:, :, 1]).all() and (rgba[:, :, 1] == rgba[:, :, 2]).all())
+    out = [("RGB" if opaque else "RGBA", rgba_img.convert("RGB") if opaque else rgba_img)]
+    if gray:
+        out.append(("L" if opaque else "LA", rgba_img.convert("L" if opaque else "LA")))
+    exact = exact_palette(rgba)
+    if exact is not None:
+        out.append(("palette (exact)", exact))
+    elif budget > 0:
+        for n in PALETTE_SIZES:
+            q = quantized(rgba_img, n)
+            err = perceptual_error(rgba, q)
+            if err > budget:
+                break  # fewer colors only gets worse
+            out.append((f"palette {n} (err {err:.5f})", q))
+    return out
+
+
+def png_bit_depth(path: Path | str) -> int | None:
+    """Bit depth from the IHDR of a PNG file (Pillow reads 16-bit RGB(A) as 8-bit RGB(A))."""
+    with open(path, "rb") as f:
+        head = f.read(26)
+    if head[:8] != PNG_SIG or head[12:16] != b"IHDR":
+        return None
+    return head[24]
+
+
+def optimize_image(img: Image.Image, budget: float = BUDGET) -> Tuple[bytes, str]:
+    """Smallest PNG encoding of ``img`` within the budget; returns (bytes, description)."""
+    if img.mode not in EXACT_MODES:
+        raise ValueError(f"mode {img.mode} can't be encoded exactly")
+    if img.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+        img = img.convert("RGBA")
+    info = {k: img.info[k] for k in ("icc_profile", "srgb", "gamma") if k in img.info}
+    best: Tuple[bytes, str] | None = None
+    for label, cand in candidates(img, budget):
+        data, how = encode_png(cand, info)
+        if best is None or len(data) < len(best[0]):
+            best = (data, f"{label}, {how}")
+    assert best is not None
+    return best
+
+
+def save_png(img: Image.Image, path: Path | str, budget: float = BUDGET) -> int:
+    """Drop-in for ``img.save(path, "PNG")`` that writes the optimized encoding; returns its size.
+
+    Images in a mode the encoder can't reproduce exactly are saved by Pillow as before.
+    """
+    if img.mode not in EXACT_MODES:
+        img.save(path, "PNG")
+        return Path(path).stat().st_size
+    data, _ = optimize_image(img, budget)
+    Path(path).write_bytes(data)
+    return len(data)
+
+
+def optimize_file(src: Path, dest: Path, budget: float, dry_run: bool = False) -> Tuple[Path, int, int, str]:
+    """Optimize one file; returns (src, bytes before, bytes after, description)."""
+    before = src.stat().st_size
+    data, how = None, "kept original"
+    with Image.open(src) as im:
+        if im.mode not in EXACT_MODES:
+            how = f"kept original (mode {im.mode})"
+        elif png_bit_depth(src) == 16:
+            how = "kept original (16-bit)"
+        else:
+            im.load()
+            data, how = optimize_image(im, budget)
+    if data is None or len(data) >= before:
+        if dest != src and not dry_run:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            dest.write_bytes(src.read_bytes())
+        return src, before, before, how if data is None else "kept original"
+    if not dry_run:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.write_bytes(data)
+    return src, before, len(data), how
+
+
+def expand(patterns: List[str]) -> List[Path]:
+    seen: Dict[str, Path] = {}
+    for pat in patterns:
+        for m in (glob.glob(pat, recursive=True) if glob.has_magic(pat) else [pat]):
+            p = Path(m)
+            if p.is_file() and p.suffix.lower() == ".png":
+                seen.setdefault(str(p.resolve()), p)
+    return sorted(seen.values())
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Shrink PNGs losslessly, or within a perceptual error budget.")
+    ap.add_argument("inputs", nargs="+", help="files or quoted globs")
+    ap.add_argument("--budget", type=float, default=BUDGET,
+                    help=f"max {PERCENTILE}th-percentile low-pass YIQ delta for palette quantization (0 = lossless)")
+    ap.add_argument("--out-dir", default=DEFAULT_OUT, help=f"output folder (default: {DEFAULT_OUT})")
+    ap.add_argument("--in-place", action="store_true", help="overwrite the inputs instead (opt-in)")
+    ap.add_argument("--workers", type=int, default=None, help="process count (default: CPU cores)")
+    ap.add_argument("--dry-run", action="store_true", help="report the savings without writing")
+    args = ap.parse_args()
+
+    files = expand(args.inputs)
+    if not files:
+        print("No PNGs matched.")
+        return
+    out_dir = None if args.in_place else Path(args.out_dir)
+    if out_dir is not None:
+        claimed: Dict[str, Path] = {}
+        for src in files:
+            other = claimed.setdefault(src.name.casefold(), src)
+            if other is not src:
+                raise SystemExit(f"{other} and {src} would both be written to {out_dir / src.name}; "
+                                 "run them separately")
+    t0 = time.perf_counter()
+    total_before = total_after = 0
+    with ProcessPoolExecutor(max_workers=min(args.workers or os.cpu_count() or 1, len(files))) as pool:
+        futures = {}
+        for src in files:
+            dest = out_dir / src.name if out_dir is not None else src
+            futures[pool.submit(optimize_file, src, dest, args.budget, args.dry_run)] = src
+        for fut in as_completed(futures):
+            try:
+                src, before, after, how = fut.result()
+            except Exception as e:
+                print(f"✗ {futures[fut]}: {e}")
+                continue
+            total_before += before
+            total_after += after
+            print(f"✓ {src}: {before / 1024:.0f} KB → {after / 1024:.0f} KB "
+                  f"(-{(before - after) / max(before, 1):.0%}; {how})")
+    print("-" * 30)
+    print(f"{len(files)} file(s) in {time.perf_counter() - t0:.2f}s: {total_before / 1024:.0f} KB → "
+          f"{total_after / 1024:.0f} KB, saved {(total_before - total_after) / 1024:.0f} KB"
+          + (" (dry run)" if args.dry_run else ""))
+
+
+if __name__ == "__main__":
+    main()
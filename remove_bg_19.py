@@ -3,7 +3,8 @@
 Remove background from image 19 and save as PNG with transparency
 """
 
-from rembg import remove
+from bg_service import DEFAULT_MODEL, remove_background
+from build_cache import BuildCache
 from PIL import Image
 import os
 
@@ -16,16 +17,25 @@ def remove_background_from_19():
         print(f"Error: {input_path} not found!")
         return
     
+    # Skip if neither the input nor the parameters changed since the last run
+    cache = BuildCache()
+    key = cache.key(input_path, "remove_bg_19", {"model": DEFAULT_MODEL})
+    if cache.is_fresh(output_path, key):
+        print(f"{output_path} is up to date.")
+        return
+    
     print(f"Processing {input_path}...")
     
     # Read the image
     input_image = Image.open(input_path)
     
     # Remove background
-    output_image = remove(input_image)
+    output_image = remove_background(input_image)
     
     # Save the result
     output_image.save(output_path, "PNG")
+    cache.record(output_path, key)
+    cache.save()
     
     print(f"Background removed! Saved as {output_path}")
     print("You can now replace the original image with this one.")
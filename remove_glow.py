@@ -3,51 +3,70 @@
 Remove glow effect and clean up edges of the mirror image
 """
 
-from PIL import Image, ImageFilter
+import argparse
+
+from PIL import Image
 import numpy as np
 
-def remove_glow():
-    input_path = "assets/landing_mirror_oval_no_bg.png"
-    output_path = "assets/landing_mirror_oval_clean.png"
-    
-    # Open the image
-    img = Image.open(input_path)
-    img = img.convert('RGBA')
-    
-    # Convert to numpy array for easier manipulation
-    data = np.array(img)
-    
-    # Get color channels
-    red_channel = data[:, :, 0]
-    green_channel = data[:, :, 1]
-    blue_channel = data[:, :, 2]
+from build_cache import BuildCache
+from edge_refine import edge_params, refine_edges
+from tiling import STRIP_ROWS, process_tiled
+
+BLUR_RADIUS = 0.2
+ALPHA_MIN = 200
+CACHE_VERSION = 1  # bump when a change to the glow rule alters the output
+
+def strip_glow_array(data, alpha_min=ALPHA_MIN):
+    """Apply the glow rule in place to an RGBA uint8 array"""
     alpha_channel = data[:, :, 3]
     
-    # Find semi-transparent areas (glow effect)
-    semi_transparent = (alpha_channel > 0) & (alpha_channel < 200)
+    # The glow masks (semi-transparent: 0 < a < 200, bright glow: a < 100,
+    # very low alpha: a < 50) together cover exactly a < 200, so a single
+    # in-place pass over the alpha channel is enough: keep a >= alpha_min, zero the rest
+    np.multiply(alpha_channel, alpha_channel >= alpha_min, out=alpha_channel)
     
-    # Find areas that are too bright with low alpha (glow artifacts)
-    bright_glow = ((red_channel > 150) | (green_channel > 150) | (blue_channel > 150)) & (alpha_channel < 100)
-    
-    # Find any areas with very low alpha that might be glow
-    low_alpha_glow = alpha_channel < 50
-    
-    # Combine all glow masks
-    glow_areas = semi_transparent | bright_glow | low_alpha_glow
+    return data
+
+def strip_glow(img, alpha_min=ALPHA_MIN, blur=BLUR_RADIUS):
+    """Return a copy of img with the semi-transparent glow removed"""
+    data = strip_glow_array(np.array(img.convert('RGBA')), alpha_min)
     
-    # Set glow areas to completely transparent
-    data[glow_areas, 3] = 0
+    # Smooth the edge where the glow was cut (alpha-boundary band only)
+    refine_edges(data, blur)
     
     # Create new image from cleaned data
     cleaned_img = Image.fromarray(data)
     
-    # Apply a very slight blur to smooth any remaining edge artifacts
-    cleaned_img = cleaned_img.filter(ImageFilter.GaussianBlur(radius=0.2))
+    return cleaned_img
+
+def remove_glow(tiled=False, strip_rows=STRIP_ROWS):
+    input_path = "assets/landing_mirror_oval_no_bg.png"
+    output_path = "assets/landing_mirror_oval_clean.png"
+    
+    # Skip if the input hasn't changed since the last run
+    cache = BuildCache()
+    key = cache.key(input_path, "remove_glow", {"alpha_min": ALPHA_MIN, **edge_params(BLUR_RADIUS)},
+                    version=CACHE_VERSION)
+    if cache.is_fresh(output_path, key):
+        print(f"{output_path} is up to date.")
+        return
     
-    # Save the result
-    cleaned_img.save(output_path, "PNG")
+    if tiled:
+        # Same pixels, but processed and written in row strips to bound memory
+        process_tiled(input_path, output_path, strip_glow_array, BLUR_RADIUS, strip_rows)
+    else:
+        cleaned_img = strip_glow(Image.open(input_path))
+        
+        # Save the result
+        cleaned_img.save(output_path, "PNG")
+    cache.record(output_path, key)
+    cache.save()
     
     print(f"Glow effect removed! Saved as {output_path}")
 
 if __name__ == "__main__":
-    remove_glow()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tiled", action="store_true", help="process in row strips (peak memory about one decoded copy)")
+    parser.add_argument("--strip-rows", type=int, default=STRIP_ROWS)
+    args = parser.parse_args()
+    remove_glow(args.tiled, args.strip_rows)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Visual-regression diff for screenshots/ against a stored baseline.
+
+Usage:
+  python screenshot_diff.py                 # compare screenshots/*.png to screenshots/baseline/
+  python screenshot_diff.py --update        # accept the current captures as the new baseline
+  python screenshot_diff.py --threshold 0.05 --tile 64
+
+Output (screenshots/diff/):
+  <name>.png   heatmap: dimmed grayscale capture, changed pixels in red (brighter = larger change);
+               only for captures that changed
+  <name>.json  score for that page/viewport, for every capture (new and identical ones too)
+  report.json  all scores, worst first
+
+How it works:
+  - Identical files (same SHA-256) are skipped without decoding.
+  - Otherwise both images are decoded and compared per pixel with a perceptual
+    YIQ color distance (the metric pixelmatch uses), normalized to 0..1.
+  - Pixels above --threshold count as changed; the image is also scored per tile
+    so a small, concentrated change still stands out.
+  - Captures are compared in parallel across a process pool.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+import numpy as np
+
+SCREENSHOTS = Path("screenshots")
+BASELINE = SCREENSHOTS / "baseline"
+DIFF = SCREENSHOTS / "diff"
+
+# Largest possible YIQ delta (black vs white), used to normalize scores to 0..1
+MAX_YIQ_DELTA = 35215.0
+
+
+def file_hash(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def load_rgb(path, size):
+    """Decode to float32 RGB padded (with magenta, so padding reads as changed) to `size`"""
+    img = Image.open(path).convert("RGB")
+    if img.size != size:
+        canvas = Image.new("RGB", size, (255, 0, 255))
+        canvas.paste(img, (0, 0))
+        img = canvas
+    return np.asarray(img, dtype=np.float32)
+
+
+def yiq_delta(a, b):
+    """Per-pixel perceptual distance between two float RGB arrays, 0..1"""
+    d = a - b
+    dr, dg, db = d[:, :, 0], d[:, :, 1], d[:, :, 2]
+    y = dr * 0.29889531 + dg * 0.58662247 + db * 0.11448223
+    i = dr * 0.59597799 - dg * 0.27417610 - db * 0.32180189
+    q = dr * 0.21147017 - dg * 0.52261711 + db * 0.31114694
+    return (0.5053 * y * y + 0.299 * i * i + 0.1957 * q * q) / MAX_YIQ_DELTA
+
+
+def tile_ratios(changed, tile):
+    """Fraction of changed pixels in each tile x tile block"""
+    h, w = changed.shape
+    th, tw = -(-h // tile), -(-w // tile)
+    padded = np.zeros((th * tile, tw * tile), dtype=np.float32)
+    padded[:h, :w] = changed
+    return padded.reshape(th, tile, tw, tile).mean(axis=(1, 3))
+
+
+def heatmap(current, delta, changed):
+    """Dimmed grayscale of the capture with changes painted red"""
+    gray = current @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    base = 255 - (255 - gray) * 0.3  # washed out so the red stands out
+    out = np.repeat(base[:, :, None], 3, axis=2)
+    fade = 255 * (1 - np.clip(np.sqrt(delta[changed]) * 4, 0.35, 1.0))
+    out[changed] = np.stack([np.full_like(fade, 255), fade, fade], axis=1)
+    return Image.fromarray(out.astype(np.uint8))
+
+
+def compare(name, threshold=0.02, tile=32):
+    """Compare one capture to its baseline; writes the heatmap if it changed, returns the score dict"""
+    current_path, baseline_path = SCREENSHOTS / name, BASELINE / name
+    score = {"name": name}
+    if not baseline_path.exists():
+        score["status"] = "new"
+        return score
+    if file_hash(current_path) == file_hash(baseline_path):
+        score.update(status="identical", changed_ratio=0.0)
+        return score
+
+    with Image.open(current_path) as cur, Image.open(baseline_path) as base:
+        cur_size, base_size = cur.size, base.size
+    size = (max(cur_size[0], base_size[0]), max(cur_size[1], base_size[1]))
+    current = load_rgb(current_path, size)
+    baseline = load_rgb(baseline_path, size)
+    delta = yiq_delta(current, baseline)
+    changed = delta > threshold
+    tiles = tile_ratios(changed, tile)
+
+    score.update(
+        status="changed" if changed.any() else "identical",
+        size=list(cur_size),
+        baseline_size=list(base_size),
+        changed_pixels=int(changed.sum()),
+        changed_ratio=round(float(changed.mean()), 6),
+        mean_delta=round(float(delta.mean()), 6),
+        changed_tiles=int((tiles > 0).sum()),
+        worst_tile_ratio=round(float(tiles.max()), 4),
+    )
+    if changed.any():
+        stem = Path(name).stem
+        heatmap(current, delta, changed).save(DIFF / f"{stem}.png")
+    return score
+
+
+def run(threshold=0.02, tile=32, workers=None):
+    names = sorted(p.name for p in SCREENSHOTS.glob("*.png"))
+    if not names:
+        print("No screenshots to compare.")
+        return []
+    DIFF.mkdir(parents=True, exist_ok=True)
+    for old in list(DIFF.glob("*.png")) + list(DIFF.glob("*.json")):
+        old.unlink()  # heatmaps from a previous run
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        scores = list(pool.map(compare, names, [threshold] * len(names), [tile] * len(names)))
+    elapsed = time.perf_counter() - start
+
+    for s in scores:
+        (DIFF / f"{Path(s['name']).stem}.json").write_text(json.dumps(s, indent=2))
+    scores.sort(key=lambda s: s.get("changed_ratio", 1.0), reverse=True)
+    (DIFF / "report.json").write_text(json.dumps(scores, indent=2))
+    for s in scores:
+        if s["status"] == "changed":
+            print(f"✗ {s['name']}: {s['changed_ratio']:.2%} changed, worst tile {s['worst_tile_ratio']:.0%}")
+        elif s["status"] == "new":
+            print(f"+ {s['name']}: no baseline yet")
+    changed = sum(s["status"] == "changed" for s in scores)
+    print("=" * 50)
+    print(f"{len(scores)} capture(s) compared in {elapsed:.2f}s: {changed} changed. Report: {DIFF / 'report.json'}")
+    return scores
+
+
+def update_baseline():
+    BASELINE.mkdir(parents=True, exist_ok=True)
+    names = sorted(SCREENSHOTS.glob("*.png"))
+    for p in names:
+        shutil.copy2(p, BASELINE / p.name)
+    print(f"✓ Baseline updated with {len(names)} capture(s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare screenshots against the stored baseline.")
+    parser.add_argument("--update", action="store_true", help="copy current captures into the baseline")
+    parser.add_argument("--threshold", type=float, default=0.02, help="per-pixel change threshold (0..1)")
+    parser.add_argument("--tile", type=int, default=32, help="tile size in pixels for the tile scores")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.update:
+        update_baseline()
+    else:
+        run(args.threshold, args.tile, args.workers)
+
+
+if __name__ == "__main__":
+    main()
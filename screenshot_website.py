@@ -2,15 +2,137 @@
 """
 Website Screenshot Tool for Bianca's Portfolio
 Takes screenshots of all pages for proofing and feedback
+
+Usage:
+  python screenshot_website.py                                # desktop + mobile, 2 browsers
+  python screenshot_website.py --workers 4 --viewports desktop,tablet,mobile
+  python screenshot_website.py --viewports desktop,1280x800,390x844@3m  # @3 = 3x DPR
+  python screenshot_website.py --metrics                      # also LCP/CLS/image audit
+
+Viewports are preset names (see VIEWPORTS) or WIDTHxHEIGHT[@DPR][m], where the
+trailing "m" emulates a mobile device (touch, mobile user agent layout).
+
+Unless --base-url is given, the site is served from this folder by a built-in
+server on a free local port for the length of the run (no external server needed).
 """
 
+import argparse
+import json
 import os
+import queue
+import threading
 import time
+from contextlib import contextmanager
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+
+# name: (width, height, device pixel ratio, mobile emulation)
+VIEWPORTS = {
+    "desktop": (1920, 1080, 1, False),
+    "laptop": (1366, 768, 1, False),
+    "tablet": (768, 1024, 1, True),
+    "mobile": (375, 812, 1, True),  # iPhone size
+    "mobile-small": (320, 568, 1, True),
+}
+
+# List of pages to screenshot
+PAGES = [
+    ("/", "01_landing_page.png"),
+    ("/pages/about.html", "02_about_page.png"),
+    ("/pages/contact.html", "03_contact_page.png"),
+    ("/pages/portfolio.html", "04_portfolio_page.png"),
+    ("/pages/press.html", "05_press_page.png"),
+    ("/pages/tearsheet.html", "06_tearsheet_page.png"),
+    ("/pages/navigation.html", "07_navigation_page.png"),
+]
+
+# Returns [dom/images/fonts ready, resources finished so far]. Lazy images outside
+# the viewport are ignored since the browser won't fetch them for the capture.
+READY_SCRIPT = """
+const inView = (img) => {
+  const r = img.getBoundingClientRect();
+  return r.bottom > 0 && r.top < window.innerHeight;
+};
+const imagesDone = Array.from(document.images).every(
+  (img) => img.complete || (img.loading === 'lazy' && !inView(img))
+);
+const fontsDone = !document.fonts || document.fonts.status === 'loaded';
+return [document.readyState === 'complete' && imagesDone && fontsDone,
+        performance.getEntriesByType('resource').length];
+"""
+
+# Page-load metrics for --metrics: LCP, CLS and how every <img> was loaded.
+# Runs as an async script; buffered observers replay entries recorded before it ran.
+METRICS_SCRIPT = """
+const done = arguments[arguments.length - 1];
+const out = {lcp: null, cls: 0, images: []};
+try {
+  new PerformanceObserver((list) => {
+    for (const e of list.getEntries()) if (!e.hadRecentInput) out.cls += e.value;
+  }).observe({type: 'layout-shift', buffered: true});
+  new PerformanceObserver((list) => {
+    const e = list.getEntries().pop();
+    if (e) out.lcp = {ms: e.startTime, tag: e.element ? e.element.tagName.toLowerCase() : null,
+                      url: e.url || null};
+  }).observe({type: 'largest-contentful-paint', buffered: true});
+} catch (err) {}
+for (const img of document.images) {
+  const r = img.getBoundingClientRect();
+  out.images.push({
+    src: img.getAttribute('src'),
+    in_view: r.bottom > 0 && r.top < window.innerHeight && r.width > 0,
+    sized: img.hasAttribute('width') && img.hasAttribute('height'),
+    loading: img.getAttribute('loading'),
+    fetchpriority: img.getAttribute('fetchpriority'),
+  });
+}
+setTimeout(() => done(out), 50);
+"""
+
+SITE_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """Static file handler with HTTP/1.1 keep-alive and no per-request logging"""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+@contextmanager
+def local_server(root=SITE_ROOT):
+    """Serve `root` on an ephemeral localhost port; yields the base URL"""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=root))
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        thread.join()
+
+def parse_viewport(spec):
+    """Return (name, (width, height, dpr, mobile)) for a preset name or WIDTHxHEIGHT[@DPR][m]"""
+    if spec in VIEWPORTS:
+        return spec, VIEWPORTS[spec]
+    mobile = spec.endswith("m")
+    size, _, dpr = spec.rstrip("m").partition("@")
+    try:
+        width, height = (int(v) for v in size.split("x"))
+        return spec, (width, height, float(dpr or 1), mobile)
+    except ValueError:
+        raise SystemExit(f"Unknown viewport: {spec} (presets: {', '.join(VIEWPORTS)})")
+
+def screenshot_name(filename, viewport):
+    """Desktop keeps the plain name and mobile the mobile_ prefix; other viewports are prefixed"""
+    if viewport == "desktop":
+        return filename
+    return f"{viewport}_{filename}"
 
 def setup_driver():
     """Setup Chrome driver with options"""
@@ -20,78 +142,159 @@ def setup_driver():
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--window-size=1920,1080")  # Desktop size
     chrome_options.add_argument("--disable-gpu")
-    
+
     driver = webdriver.Chrome(options=chrome_options)
     return driver
 
-def take_screenshot(driver, url, filename, wait_time=3):
-    """Take screenshot of a page"""
+def set_viewport(driver, viewport):
+    """Emulate an exact viewport (CSS size, DPR, mobile) through Chrome DevTools"""
+    width, height, dpr, mobile = viewport
+    driver.execute_cdp_cmd("Emulation.setDeviceMetricsOverride", {
+        "width": width,
+        "height": height,
+        "deviceScaleFactor": dpr,
+        "mobile": mobile,
+    })
+    driver.execute_cdp_cmd("Emulation.setTouchEmulationEnabled", {"enabled": mobile})
+
+def wait_until_ready(driver, timeout=10, idle=0.3):
+    """Wait for DOM, images and web fonts, then for the network to go quiet.
+    
+    "Network idle" means no new resource finished loading for `idle` seconds.
+    Returns False if the page still wasn't ready after `timeout` seconds.
+    """
+    state = {"count": -1, "since": time.monotonic()}
+
+    def ready(d):
+        loaded, count = d.execute_script(READY_SCRIPT)
+        now = time.monotonic()
+        if count != state["count"]:
+            state["count"], state["since"] = count, now
+        return loaded and now - state["since"] >= idle
+
     try:
-        print(f"Taking screenshot of: {url}")
+        WebDriverWait(driver, timeout, poll_frequency=0.05).until(ready)
+        return True
+    except TimeoutException:
+        return False
+
+def page_metrics(driver):
+    """LCP, CLS and per-image loading hints of the current page (see METRICS_SCRIPT)"""
+    m = driver.execute_async_script(METRICS_SCRIPT)
+    m["unsized"] = [i["src"] for i in m["images"] if not i["sized"]]
+    m["lazy_in_view"] = [i["src"] for i in m["images"] if i["in_view"] and i["loading"] == "lazy"]
+    return m
+
+def take_screenshot(driver, url, filename, viewport=VIEWPORTS["desktop"], timeout=10, metrics=None):
+    """Take screenshot of a page at the given viewport once it has finished loading.
+
+    If `metrics` is a dict, the page's load metrics are stored in it under `filename`.
+    """
+    try:
+        set_viewport(driver, viewport)
+        start = time.perf_counter()
         driver.get(url)
-        time.sleep(wait_time)  # Wait for page to load
-        
+        if not wait_until_ready(driver, timeout):
+            print(f"! {filename}: still loading after {timeout}s, capturing anyway")
+        ready_in = time.perf_counter() - start
+
         # Take screenshot
         driver.save_screenshot(f"screenshots/{filename}")
-        print(f"✓ Saved: {filename}")
-        
+        print(f"✓ Saved: {filename} (ready in {ready_in:.2f}s)")
+        if metrics is not None:
+            m = metrics[filename] = page_metrics(driver)
+            lcp = m["lcp"] or {}
+            print(f"  LCP {lcp.get('ms', 0) / 1000:.2f}s ({lcp.get('tag')}), CLS {m['cls']:.3f}, "
+                  f"{len(m['unsized'])} unsized / {len(m['lazy_in_view'])} lazy-in-view image(s)")
+        return True
+
     except Exception as e:
-        print(f"✗ Error with {url}: {e}")
+        print(f"✗ Error with {url} ({filename}): {e}")
+        return False
 
-def take_mobile_screenshot(driver, url, filename, wait_time=3):
-    """Take mobile-sized screenshot"""
+def screenshot_worker(jobs, results, timeout, metrics=None):
+    """Drive one headless browser through jobs until the queue is empty"""
     try:
-        print(f"Taking mobile screenshot of: {url}")
-        driver.set_window_size(375, 812)  # iPhone size
-        driver.get(url)
-        time.sleep(wait_time)
-        
-        driver.save_screenshot(f"screenshots/mobile_{filename}")
-        print(f"✓ Saved: mobile_{filename}")
-        
+        driver = setup_driver()
     except Exception as e:
-        print(f"✗ Error with mobile {url}: {e}")
+        print(f"✗ Could not start a browser: {e}")
+        return
+    try:
+        while True:
+            try:
+                url, filename, viewport = jobs.get_nowait()
+            except queue.Empty:
+                return
+            results.append(take_screenshot(driver, url, filename, viewport, timeout, metrics))
+    finally:
+        driver.quit()
+
+def run_screenshots(base_url, viewports, workers=2, timeout=10, metrics=None):
+    """Shard the page x viewport matrix across a pool of headless browsers"""
+    jobs = queue.Queue()
+    for path, filename in PAGES:
+        for name, viewport in viewports:
+            jobs.put((base_url + path, screenshot_name(filename, name), viewport))
+    total = jobs.qsize()
+    workers = max(1, min(workers, total))
+
+    results = []  # list.append is atomic, so threads can share it
+    threads = [
+        threading.Thread(target=screenshot_worker, args=(jobs, results, timeout, metrics))
+        for _ in range(workers)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    ok = sum(results)
+    print("=" * 50)
+    print(f"✓ {ok}/{total} screenshots with {workers} browser(s) in {elapsed:.1f}s")
+    return ok == total
 
 def main():
+    parser = argparse.ArgumentParser(description="Screenshot every page at several viewports.")
+    parser.add_argument("--base-url", default=None,
+                        help="use an already running site instead of the built-in server")
+    parser.add_argument("--viewports", default="desktop,mobile",
+                        help="comma-separated presets or WIDTHxHEIGHT[@DPR][m] (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=2, help="headless browsers in the pool")
+    parser.add_argument("--timeout", type=float, default=10, help="max seconds to wait for a page to load")
+    parser.add_argument("--diff", action="store_true", help="compare against screenshots/baseline afterwards")
+    parser.add_argument("--metrics", action="store_true",
+                        help="record LCP/CLS/image loading per capture in screenshots/metrics.json")
+    args = parser.parse_args()
+
     # Create screenshots directory
     if not os.path.exists("screenshots"):
         os.makedirs("screenshots")
-    
-    # Base URL (you'll need to update this to your actual URL)
-    base_url = "http://localhost:5500"  # Update this to your actual URL
-    
-    # List of pages to screenshot
-    pages = [
-        ("/", "01_landing_page.png"),
-        ("/pages/about.html", "02_about_page.png"),
-        ("/pages/contact.html", "03_contact_page.png"),
-        ("/pages/portfolio.html", "04_portfolio_page.png"),
-        ("/pages/press.html", "05_press_page.png"),
-        ("/pages/tearsheet.html", "06_tearsheet_page.png"),
-        ("/pages/navigation.html", "07_navigation_page.png"),
-    ]
-    
-    driver = setup_driver()
-    
+
+    viewports = [parse_viewport(v.strip()) for v in args.viewports.split(",") if v.strip()]
+    metrics = {} if args.metrics else None
+
     try:
         print("Starting website screenshots...")
         print("=" * 50)
-        
-        for path, filename in pages:
-            url = base_url + path
-            take_screenshot(driver, url, filename)
-            take_mobile_screenshot(driver, url, filename)
-            print("-" * 30)
-        
-        print("=" * 50)
-        print("✓ All screenshots completed!")
+        if args.base_url:
+            run_screenshots(args.base_url.rstrip("/"), viewports, args.workers, args.timeout, metrics)
+        else:
+            with local_server() as base_url:
+                print(f"Serving {SITE_ROOT} at {base_url}")
+                run_screenshots(base_url, viewports, args.workers, args.timeout, metrics)
         print(f"Screenshots saved in: {os.path.abspath('screenshots')}")
-        
+        if metrics:
+            with open("screenshots/metrics.json", "w") as f:
+                json.dump(dict(sorted(metrics.items())), f, indent=2)
+            print("Metrics saved in: screenshots/metrics.json")
+        if args.diff:
+            import screenshot_diff
+            screenshot_diff.run()
+
     except Exception as e:
         print(f"Error: {e}")
-    
-    finally:
-        driver.quit()
 
 if __name__ == "__main__":
     main()
@@ -1,18 +1,79 @@
 """
 Tiny live-reload dev server for static site.
 
-Usage: python3 serve.py [port]
+Usage:
+  python3 serve.py [port]                          # live reload while editing
+  python3 serve.py --preview                       # production-like headers, no reload
+  python3 serve.py --preview --precompress --root dist
 Default port: 5173 (auto-fallback if busy)
+
+Standard library only: no installs, no network access needed. Changes are picked
+up with inotify on Linux (mtime polling elsewhere) and pushed to open pages over
+Server-Sent Events; CSS-only changes swap stylesheets without a full reload.
+
+--preview serves the site the way a CDN would, to measure page loads before
+deploying: precompressed .br/.gz siblings of text assets (--precompress writes
+them; .br needs the optional brotli package), strong ETags with 304 responses,
+long-lived immutable caching for fingerprinted names and byte ranges (the press
+PDFs).
 """
+import argparse
+import ctypes
+import fnmatch
+import gzip
+import hashlib
 import os
-import sys
+import re
+import select
 import socket
+import struct
+import sys
 import threading
 import time
 import webbrowser
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import brotli  # optional, only for --precompress
+except ImportError:
+    brotli = None
 
 DEFAULT_PORT = 5173
-PORT = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+WATCH_PATTERNS = [
+    "index.html",
+    "styles.css",
+    "pages/*.html",
+    "assets/icons/*",
+    "assets/img/*",
+]
+EVENTS_PATH = "/__livereload"
+DEBOUNCE = 0.1  # seconds to gather a burst of saves into one reload
+
+# Preview mode
+COMPRESSIBLE = {".html", ".css", ".js", ".svg", ".xml", ".txt", ".json", ".webmanifest"}
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]  # preferred first
+HASHED_NAME = re.compile(r"\.[0-9a-f]{8,}\.\w+$")  # e.g. styles.3f2a9c1e0b.css
+IMMUTABLE = "public, max-age=31536000, immutable"
+SKIP_DIRS = {"screenshots", "locked", "build", "node_modules", "venv", ".venv"}
+
+RELOAD_SCRIPT = b"""<script>
+(() => {
+  const es = new EventSource('%s');
+  es.addEventListener('reload', () => location.reload());
+  es.addEventListener('css', () => {
+    document.querySelectorAll('link[rel="stylesheet"]').forEach((link) => {
+      const url = new URL(link.href);
+      if (url.origin !== location.origin) return;
+      url.searchParams.set('_lr', Date.now());
+      link.href = url.href;
+    });
+  });
+})();
+</script>
+""" % EVENTS_PATH.encode()
 
 
 def get_lan_ip() -> str:
@@ -37,25 +98,369 @@ def find_open_port(start: int, limit: int = 20) -> int:
     return start  # fallback
 
 
-def main():
+def is_watched(rel_path: str) -> bool:
+    rel_path = rel_path.replace(os.sep, "/")
+    return any(fnmatch.fnmatch(rel_path, pat) for pat in WATCH_PATTERNS)
+
+
+class Reloader:
+    """Broadcasts change notifications to every open SSE connection."""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.version = 0
+        self.kind = "reload"
+
+    def notify(self, changed):
+        kind = "css" if all(p.endswith(".css") for p in changed) else "reload"
+        with self.cond:
+            self.version += 1
+            self.kind = kind
+            self.cond.notify_all()
+        print(f"↻ {kind}: {', '.join(sorted(changed))}")
+
+    def wait(self, seen: int, timeout: float):
+        """Block until the version moves past ``seen``; returns (version, kind)."""
+        with self.cond:
+            self.cond.wait_for(lambda: self.version != seen, timeout)
+            return self.version, self.kind
+
+
+def _watch_dirs(root):
+    dirs = {os.path.dirname(pat) for pat in WATCH_PATTERNS}
+    return [os.path.join(root, d) for d in sorted(dirs) if os.path.isdir(os.path.join(root, d))]
+
+
+def watch_inotify(reloader: Reloader, root: str) -> bool:
+    """Watch with Linux inotify via libc; returns False if unavailable."""
+    if not sys.platform.startswith("linux"):
+        return False
     try:
-        from livereload import Server  # type: ignore
-    except Exception:
-        print("Installing livereload…")
-        os.system(f"{sys.executable} -m pip install --quiet livereload")
-        from livereload import Server  # type: ignore
-
-    port = find_open_port(PORT)
-    server = Server()
-    watch_patterns = [
-        "index.html",
-        "styles.css",
-        "pages/*.html",
-        "assets/icons/*",
-        "assets/img/*",
-    ]
-    for pat in watch_patterns:
-        server.watch(pat)
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return False
+    if fd < 0:
+        return False
+    # IN_ATTRIB (touch) | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    mask = 0x004 | 0x008 | 0x080 | 0x100 | 0x200
+    dirs = {}
+    for d in _watch_dirs(root):
+        wd = libc.inotify_add_watch(fd, d.encode(), mask)
+        if wd >= 0:
+            dirs[wd] = d
+
+    def loop():
+        pending = set()
+        while True:
+            ready, _, _ = select.select([fd], [], [], DEBOUNCE if pending else None)
+            if not ready:
+                reloader.notify(pending)
+                pending = set()
+                continue
+            buf = os.read(fd, 64 * 1024)
+            offset = 0
+            while offset < len(buf):
+                wd, _, _, length = struct.unpack_from("iIII", buf, offset)
+                name = buf[offset + 16:offset + 16 + length].rstrip(b"\0").decode(errors="replace")
+                offset += 16 + length
+                if wd in dirs and name:
+                    rel = os.path.relpath(os.path.join(dirs[wd], name), root)
+                    if is_watched(rel):
+                        pending.add(rel)
+
+    threading.Thread(target=loop, daemon=True).start()
+    return True
+
+
+def watch_polling(reloader: Reloader, root: str, interval: float = 0.5) -> None:
+    """Fallback: compare mtimes of watched files every ``interval`` seconds."""
+
+    def snapshot():
+        mtimes = {}
+        for d in _watch_dirs(root):
+            with os.scandir(d) as it:
+                for entry in it:
+                    rel = os.path.relpath(entry.path, root)
+                    if entry.is_file() and is_watched(rel):
+                        mtimes[rel] = entry.stat().st_mtime_ns
+        return mtimes
+
+    def loop():
+        before = snapshot()
+        while True:
+            time.sleep(interval)
+            now = snapshot()
+            changed = {p for p in before.keys() | now.keys() if before.get(p) != now.get(p)}
+            if changed:
+                reloader.notify(changed)
+            before = now
+
+    threading.Thread(target=loop, daemon=True).start()
+
+
+class DevHandler(SimpleHTTPRequestHandler):
+    """Static files with the reload client injected into HTML and an SSE endpoint."""
+
+    protocol_version = "HTTP/1.1"
+    reloader: Reloader = None
+
+    def end_headers(self):
+        self.send_header("Cache-Control", "no-store")
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == EVENTS_PATH:
+            return self.stream_events()
+        fs_path = self.translate_path(self.path)
+        if os.path.isdir(fs_path) and path.endswith("/"):
+            fs_path = os.path.join(fs_path, "index.html")
+        if fs_path.endswith(".html") and os.path.isfile(fs_path):
+            return self.send_html(fs_path)
+        return super().do_GET()
+
+    def send_html(self, fs_path):
+        with open(fs_path, "rb") as f:
+            body = f.read()
+        i = body.lower().rfind(b"</body>")
+        body = body + RELOAD_SCRIPT if i < 0 else body[:i] + RELOAD_SCRIPT + body[i:]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        seen = self.reloader.version
+        try:
+            while True:
+                version, kind = self.reloader.wait(seen, timeout=15)
+                if version == seen:
+                    self.wfile.write(b": ping\n\n")  # keep proxies/browsers from timing out
+                else:
+                    seen = version
+                    self.wfile.write(f"event: {kind}\ndata: {version}\n\n".encode())
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+_etags = {}  # (path, size, mtime_ns) -> strong ETag
+
+
+def file_etag(path: str, st: os.stat_result) -> str:
+    """Strong ETag from the file contents, cached until the file changes."""
+    key = (path, st.st_size, st.st_mtime_ns)
+    etag = _etags.get(key)
+    if etag is None:
+        h = hashlib.blake2b(digest_size=12)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        etag = _etags[key] = f'"{h.hexdigest()}"'
+    return etag
+
+
+def etag_matches(header, etag: str) -> bool:
+    """If-None-Match comparison (weak, per RFC 9110) against a strong ETag."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def parse_range(header: str, size: int):
+    """Return (start, end) for a single "bytes=" range, or None to ignore the header.
+
+    An unsatisfiable range (first byte past the end) comes back with start >= size;
+    a malformed one, such as last < first, is ignored.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None  # other units / multipart ranges: send the whole file
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:  # suffix range: last N bytes
+            n = int(last)
+            return (max(0, size - n), size - 1) if n > 0 else (size, size)
+        start = int(first)
+        end = int(last) if last else None
+    except ValueError:
+        return None
+    if end is not None and end < start:
+        return None  # last < first is malformed, not unsatisfiable (RFC 9110 14.1.1)
+    if start >= size:
+        return (size, size)
+    return (start, size - 1 if end is None else min(end, size - 1))
+
+
+def precompress(root: str) -> None:
+    """Write .gz (and .br with brotli) siblings for text assets that are stale or missing."""
+    written = saved = 0
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            if os.path.splitext(name)[1] not in COMPRESSIBLE:
+                continue
+            mtime = os.stat(path).st_mtime_ns
+            data = None
+            for encoding, suffix in ENCODINGS:
+                if encoding == "br" and brotli is None:
+                    continue
+                target = path + suffix
+                if os.path.exists(target) and os.stat(target).st_mtime_ns >= mtime:
+                    continue
+                if data is None:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                if encoding == "br":
+                    packed = brotli.compress(data, quality=11)
+                else:
+                    packed = gzip.compress(data, 9, mtime=0)
+                if len(packed) >= len(data):
+                    continue
+                with open(target, "wb") as f:
+                    f.write(packed)
+                written += 1
+                saved += len(data) - len(packed)
+    note = "" if brotli else " (install brotli for .br)"
+    print(f"✓ Precompressed {written} file(s), {saved / 1024:.1f} KB smaller{note}")
+
+
+class PreviewHandler(SimpleHTTPRequestHandler):
+    """Production-like static serving: precompressed siblings, validators and ranges."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.serve(head=False)
+
+    def do_HEAD(self):
+        self.serve(head=True)
+
+    def pick_encoding(self, path):
+        """Return (content-encoding or None, file to send) for the client's Accept-Encoding."""
+        if os.path.splitext(path)[1] not in COMPRESSIBLE:
+            return None, path
+        accepted = set()
+        for token in self.headers.get("Accept-Encoding", "").split(","):
+            name, _, params = token.strip().partition(";")
+            if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                accepted.add(name.strip().lower())
+        mtime = os.stat(path).st_mtime_ns
+        for encoding, suffix in ENCODINGS:
+            sibling = path + suffix
+            if encoding in accepted and os.path.isfile(sibling) and os.stat(sibling).st_mtime_ns >= mtime:
+                return encoding, sibling
+        return None, path
+
+    def serve(self, head):
+        url_path = self.path.split("?", 1)[0].split("#", 1)[0]
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not url_path.endswith("/"):
+                f = super().send_head()  # the trailing-slash redirect
+                if f:
+                    f.close()
+                return
+            path = os.path.join(path, "index.html")
+        if not os.path.isfile(path):
+            self.send_error(404, "File not found")
+            return
+
+        ranged = "Range" in self.headers
+        encoding, served = (None, path) if ranged else self.pick_encoding(path)
+        st = os.stat(served)
+        etag = file_etag(served, st)
+
+        def common_headers():
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", IMMUTABLE if HASHED_NAME.search(path) else "no-cache")
+            self.send_header("Last-Modified", self.date_time_string(int(st.st_mtime)))
+            if os.path.splitext(path)[1] in COMPRESSIBLE:
+                self.send_header("Vary", "Accept-Encoding")
+
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            self.send_response(304)
+            common_headers()
+            self.end_headers()
+            return
+
+        size = st.st_size
+        start, end = 0, size - 1
+        span = None
+        if ranged and self.headers.get("If-Range", etag) == etag:
+            span = parse_range(self.headers["Range"], size)
+        if span and span[0] >= size:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if span:
+            start, end = span
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Length", str(end - start + 1))
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        else:
+            self.send_header("Accept-Ranges", "bytes")
+        common_headers()
+        self.end_headers()
+        if head or end < start:
+            return
+        with open(served, "rb") as f:
+            try:
+                self.connection.sendfile(f, start, end - start + 1)
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local server for the static site.")
+    ap.add_argument("port", nargs="?", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--preview", action="store_true",
+                    help="production-like serving (compression, caching headers, ranges); no live reload")
+    ap.add_argument("--precompress", action="store_true",
+                    help="write .gz/.br siblings of text assets before serving")
+    ap.add_argument("--root", default=ROOT, help="folder to serve (default: this folder)")
+    args = ap.parse_args()
+    root = os.path.abspath(args.root)
+
+    if args.precompress:
+        precompress(root)
+    port = find_open_port(args.port)
+    if args.preview:
+        handler = PreviewHandler
+        mode = "Production preview: precompressed files, ETags, ranges; no live reload."
+    else:
+        reloader = Reloader()
+        DevHandler.reloader = reloader
+        handler = DevHandler
+        watcher = "inotify" if watch_inotify(reloader, root) else "polling"
+        if watcher == "polling":
+            watch_polling(reloader, root)
+        mode = f"Live reload is enabled ({watcher})."
+    server = ThreadingHTTPServer(("0.0.0.0", port), partial(handler, directory=root))
+    server.daemon_threads = True
 
     lan_ip = get_lan_ip()
     url = f"http://localhost:{port}"
@@ -73,9 +478,14 @@ def main():
     print("\nLocal preview ready:")
     print(f"  • Browser: {url}")
     print(f"  • Same Wi‑Fi (phone/tablet): {lan_url}")
-    print("Press Ctrl+C to stop. Live reload is enabled.\n")
+    print(f"Press Ctrl+C to stop. {mode}\n")
 
-    server.serve(port=port, host="0.0.0.0", root=".")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
 
 
 if __name__ == "__main__":
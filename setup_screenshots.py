@@ -59,10 +59,8 @@ def main():
     
     print("=" * 50)
     print("✓ Setup completed successfully!")
-    print("\nNext steps:")
-    print("1. Start your local server (if not already running)")
-    print("2. Update the base_url in screenshot_website.py if needed")
-    print("3. Run: python screenshot_website.py")
+    print("\nNext step:")
+    print("Run: python screenshot_website.py  (it serves the site itself; --base-url to use another server)")
     print("\nThe script will create screenshots of all pages in desktop and mobile views.")
 
 if __name__ == "__main__":
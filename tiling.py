@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tiled (row-strip) execution for the NumPy cleanup scripts.
+
+remove_glow.py, cleanup_outlines.py and cleanup_mirror.py normally build several
+full-size masks plus the edge-refined copy. In tiled mode the source is processed
+in horizontal strips: each strip is padded with a halo of rows so the edge
+refinement (edge_refine.py) sees the same neighbours it would in the whole image, run
+through the script's array rule, refined, trimmed back to its own rows and appended
+to a streaming PNG.
+Peak memory drops to roughly one decoded copy of the source plus one strip's worth of
+masks and temporaries (instead of several full-size ones), and the pixels match the
+whole-image path exactly. It still grows with the image size: see the notes.
+
+Usage:
+  python3 remove_glow.py --tiled [--strip-rows 256]
+  python3 tiling.py check input.png        # compare tiled vs whole-image output
+
+Notes:
+  - The decoded source itself is still held once, in its own mode (Pillow has no
+    streaming PNG decode); everything derived from it, including the RGBA conversion,
+    is per strip.
+  - The writer picks the None/Sub/Up PNG filter per row (whichever has the smallest
+    absolute sum), so files are larger than Pillow's but pixel-identical.
+"""
+from __future__ import annotations
+
+import math
+import struct
+import sys
+import zlib
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+from PIL import Image
+
+from edge_refine import edge_halo, refine_edges
+
+STRIP_ROWS = 256
+
+ArrayRule = Callable[[np.ndarray], np.ndarray]
+
+
+def blur_halo(radius: float) -> int:
+    """Rows of context the edge refinement needs on each side of a strip.
+
+    A pixel is refined when a hard alpha step lies within the kernel's reach of it, and
+    its new value reads the kernel's reach again, so twice the reach (plus the step's
+    own neighbour) covers everything (edge_refine.edge_halo).
+    """
+    return edge_halo(radius)
+
+
+class PngStreamWriter:
+    """Write an RGBA PNG row strip by row strip without holding the whole image."""
+
+    def __init__(self, path: Path | str, width: int, height: int, level: int = 6):
+        self.f = open(path, "wb")
+        self.width = width
+        self.height = height
+        self.rows = 0
+        self.prev = np.zeros(width * 4, dtype=np.uint8)
+        self.z = zlib.compressobj(level)
+        self.f.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+
+    def _chunk(self, kind: bytes, data: bytes) -> None:
+        self.f.write(struct.pack(">I", len(data)))
+        self.f.write(kind)
+        self.f.write(data)
+        self.f.write(struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    def write_rows(self, rows: np.ndarray) -> None:
+        """Append an (n, width, 4) uint8 block of rows."""
+        flat = rows.reshape(rows.shape[0], -1)
+        out = bytearray()
+        for row in flat:
+            sub = row.copy()
+            sub[4:] -= row[:-4]
+            up = row - self.prev
+            # Smallest sum of signed-byte magnitudes is the usual PNG heuristic
+            cands = [(0, row), (1, sub), (2, up)]
+            ftype, data = min(cands, key=lambda c: int(np.abs(c[1].view(np.int8).astype(np.int16)).sum()))
+            out.append(ftype)
+            out += data.tobytes()
+            self.prev = row
+        self.rows += rows.shape[0]
+        compressed = self.z.compress(bytes(out))
+        if compressed:
+            self._chunk(b"IDAT", compressed)
+
+    def close(self) -> None:
+        if self.rows != self.height:
+            raise ValueError(f"wrote {self.rows} rows, expected {self.height}")
+        self._chunk(b"IDAT", self.z.flush())
+        self._chunk(b"IEND", b"")
+        self.f.close()
+
+    def __enter__(self) -> "PngStreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.f.close()
+
+
+def process_tiled(input_path: Path | str, output_path: Path | str, rule: ArrayRule,
+                  blur_radius: float, strip_rows: int = STRIP_ROWS) -> None:
+    """Apply ``rule`` then the edge refinement at ``blur_radius`` strip by strip into a PNG."""
+    img = Image.open(input_path)
+    img.load()  # the one full-size copy; each strip is converted to RGBA on its own
+    w, h = img.size
+    halo = blur_halo(blur_radius)
+    with PngStreamWriter(output_path, w, h) as out:
+        for y0 in range(0, h, strip_rows):
+            y1 = min(h, y0 + strip_rows)
+            a0, a1 = max(0, y0 - halo), min(h, y1 + halo)
+            data = refine_edges(rule(np.array(img.crop((0, a0, w, a1)).convert("RGBA"))), blur_radius)
+            out.write_rows(data[y0 - a0:y1 - a0])
+
+
+def check(input_path: str, strip_rows: int = 64) -> bool:
+    """Run every cleanup script both ways on ``input_path`` and compare pixels."""
+    import tempfile
+
+    from cleanup_mirror import BLUR_RADIUS as MIRROR_R, clean_red_reflections, clean_red_reflections_array
+    from cleanup_outlines import BLUR_RADIUS as OUTLINE_R, clean_outlines, clean_outlines_array
+    from remove_glow import BLUR_RADIUS as GLOW_R, strip_glow, strip_glow_array
+
+    ok = True
+    src = Image.open(input_path)
+    for name, whole, rule, radius in [
+        ("glow", strip_glow, strip_glow_array, GLOW_R),
+        ("outlines", clean_outlines, clean_outlines_array, OUTLINE_R),
+        ("mirror", clean_red_reflections, clean_red_reflections_array, MIRROR_R),
+    ]:
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp) / "tiled.png"
+            process_tiled(input_path, out, rule, radius, strip_rows)
+            same = np.array_equal(np.asarray(whole(src)), np.asarray(Image.open(out)))
+        ok &= same
+        print(f"{'✓' if same else '✗'} {name}")
+    return ok
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != "check":
+        print("Usage: python3 tiling.py check input.png")
+        sys.exit(1)
+    sys.exit(0 if check(sys.argv[2]) else 1)
@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+"""
+Per-page critical CSS and pruned, minified stylesheets for a built site.
+
+Usage:
+  python3 tools/fingerprint_assets.py && python3 tools/critical_css.py   # works on dist/
+  python3 tools/critical_css.py --root public --fold 60
+
+For every page with a local <link rel="stylesheet">:
+  - the stylesheet is parsed and each selector is matched against the page's DOM;
+  - rules that match nothing are dropped and the rest is minified into
+    css/<page>.<hash>.css, loaded asynchronously (preload + onload, <noscript> fallback);
+  - rules matching the first --fold elements of <body> (the above-the-fold guess)
+    are inlined in a <style data-critical> block so the first paint needs no CSS request.
+A per-page report of render-blocking bytes before and after is printed.
+
+Matching is conservative, never dropping a rule that could apply:
+  - pseudo-classes (:hover, :nth-child, :not, ...) and pseudo-elements count as matching;
+  - a selector naming a class, id or tag that appears in a string in the page's
+    scripts (classList.add('loaded'), createElement('div')) is kept, since JS may
+    create it later;
+  - @keyframes are kept when a kept rule references them; other at-rules are kept.
+Relative url()s are rewritten for where the rules end up (css/ for the async sheet,
+the page's folder for the inline block), so images and fonts still resolve.
+"""
+from __future__ import annotations
+
+import argparse
+import posixpath
+import re
+import sys
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+from fingerprint_assets import ROOT, fingerprint_name
+
+DEFAULT_ROOT = ROOT / "dist"
+PAGES = ["index.html", "index_experimental.html", "pages/*.html"]
+OUT_DIR = "css"
+FOLD = 40  # <body> elements, in document order, assumed above the fold
+
+NESTED_AT = {"media", "supports", "document", "layer", "container"}
+VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+COMMENT_OR_STRING = re.compile(r"""/\*.*?\*/|"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'""", re.DOTALL)
+STRING = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')""")
+JS_STRING = re.compile(r"""'((?:\\.|[^'\\\n])*)'|"((?:\\.|[^"\\\n])*)"|`([^`]*)`""")
+TOKEN = re.compile(r"[A-Za-z_][\w-]*")
+SIMPLE = re.compile(r"""
+    (?P<tag>\*|[A-Za-z][\w-]*)
+  | \#(?P<id>[\w-]+)
+  | \.(?P<cls>[\w-]+)
+  | \[(?P<attr>[^\]]+)\]
+  | ::?(?P<pseudo>[\w-]+)(?:\((?:[^()]|\([^()]*\))*\))?
+""", re.VERBOSE)
+ATTR_SEL = re.compile(r"""\s*([\w:-]+)\s*(?:([~|^$*]?=)\s*("[^"]*"|'[^']*'|[^\s\]]+)\s*(i|s)?)?\s*$""")
+LINK_TAG = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+TAG_ATTR = re.compile(r"""([\w-]+)\s*=\s*("[^"]*"|'[^']*')""")
+CSS_URL = re.compile(r"""url\(\s*(?:"([^"]*)"|'([^']*)'|([^)\s]*))\s*\)""", re.IGNORECASE)
+
+
+# ---------------------------------------------------------------- CSS parsing
+
+def _scan(css: str, i: int, stops: str) -> int:
+    """Index of the next top-level char in ``stops`` (outside strings and parens)."""
+    depth = 0
+    n = len(css)
+    while i < n:
+        c = css[i]
+        if c in "\"'":
+            m = STRING.match(css, i)
+            i = m.end() if m else i + 1
+            continue
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth = max(0, depth - 1)
+        elif depth == 0 and c in stops:
+            return i
+        i += 1
+    return n
+
+
+def _split_top(text: str, sep: str) -> List[str]:
+    parts, start, i = [], 0, 0
+    while True:
+        i = _scan(text.replace("[", "(").replace("]", ")"), start, sep)
+        parts.append(text[start:i])
+        if i >= len(text):
+            return [p.strip() for p in parts if p.strip()]
+        start = i + 1
+
+
+def parse_css(css: str) -> List[dict]:
+    """Parse into nodes: {"selectors", "body"} rules and {"at", "prelude", "children"|"body"} at-rules."""
+    css = COMMENT_OR_STRING.sub(lambda m: "" if m.group(0).startswith("/*") else m.group(0), css)
+    nodes, _ = _parse_block(css, 0)
+    return nodes
+
+
+def _parse_block(css: str, i: int) -> Tuple[List[dict], int]:
+    nodes: List[dict] = []
+    n = len(css)
+    while i < n:
+        j = _scan(css, i, "{};")
+        prelude = css[i:j].strip()
+        if j >= n:
+            break
+        if css[j] == "}":
+            return nodes, j + 1
+        if css[j] == ";":
+            if prelude:
+                nodes.append({"at": prelude.split()[0][1:].lower(), "prelude": prelude})
+            i = j + 1
+            continue
+        if prelude.startswith("@"):
+            name = re.match(r"@([\w-]+)", prelude).group(1).lower()
+            if name in NESTED_AT:
+                children, i = _parse_block(css, j + 1)
+                nodes.append({"at": name, "prelude": prelude, "children": children})
+                continue
+            end = _matching_brace(css, j)
+            nodes.append({"at": name, "prelude": prelude, "body": css[j + 1:end]})
+        else:
+            end = _matching_brace(css, j)
+            nodes.append({"selectors": _split_top(prelude, ","), "body": css[j + 1:end]})
+        i = end + 1
+    return nodes, i
+
+
+def _matching_brace(css: str, open_at: int) -> int:
+    depth, i = 0, open_at
+    while i < len(css):
+        i = _scan(css, i, "{}")
+        if i >= len(css):
+            break
+        depth += 1 if css[i] == "{" else -1
+        if depth == 0:
+            return i
+        i += 1
+    return len(css)
+
+
+# ---------------------------------------------------------------- minifying
+
+def _outside_strings(text: str, fn) -> str:
+    parts = STRING.split(text)
+    return "".join(p if k % 2 else fn(p) for k, p in enumerate(parts))
+
+
+def _min_selector(sel: str) -> str:
+    return _outside_strings(sel, lambda s: re.sub(r"\s*([>+~,])\s*", r"\1", " ".join(s.split())))
+
+
+def _min_block(body: str) -> str:
+    """Declarations (or a raw nested block such as @keyframes) without optional whitespace."""
+    def squeeze(s):
+        s = " ".join(s.split())
+        s = re.sub(r"\s*([{};:,>])\s*", r"\1", s)
+        return re.sub(r"\s*!\s*important", "!important", s)
+    out = _outside_strings(body, squeeze).strip()
+    out = re.sub(r";+", ";", out)
+    return out.replace(";}", "}").rstrip(";")
+
+
+def serialize(nodes: List[dict]) -> str:
+    out = []
+    for node in nodes:
+        if "selectors" in node:
+            out.append(f"{','.join(_min_selector(s) for s in node['selectors'])}{{{_min_block(node['body'])}}}")
+        elif "children" in node:
+            out.append(f"{' '.join(node['prelude'].split())}{{{serialize(node['children'])}}}")
+        elif "body" in node:
+            out.append(f"{' '.join(node['prelude'].split())}{{{_min_block(node['body'])}}}")
+        else:
+            out.append(f"{' '.join(node['prelude'].split())};")
+    return "".join(out)
+
+
+def rebase_url(url: str, from_dir: str, to_dir: str) -> str:
+    """A url() written relative to ``from_dir``, made relative to ``to_dir`` (site paths)."""
+    if not url or url.startswith(("/", "#")) or re.match(r"[A-Za-z][\w+.-]*:", url):
+        return url  # root-relative, fragment-only, data:, http(s): ... are location-independent
+    path, rest = re.match(r"([^?#]*)(.*)", url, re.DOTALL).groups()  # keep ?query / #fragment
+    target = posixpath.normpath(posixpath.join(from_dir, path))
+    return posixpath.relpath(target, to_dir or ".") + rest
+
+
+def rebase(nodes: List[dict], from_dir: str, to_dir: str) -> List[dict]:
+    """Copy of ``nodes`` with every relative url() moved from ``from_dir`` to ``to_dir``."""
+    if posixpath.normpath(from_dir or ".") == posixpath.normpath(to_dir or "."):
+        return nodes
+
+    def fix(text: str) -> str:
+        def repl(m):
+            quote = '"' if m.group(1) is not None else "'" if m.group(2) is not None else ""
+            url = next(g for g in m.groups() if g is not None)
+            return f"url({quote}{rebase_url(url, from_dir, to_dir)}{quote})"
+        return CSS_URL.sub(repl, text)
+
+    out = []
+    for node in nodes:
+        node = {**node, "prelude": fix(node["prelude"])} if "prelude" in node else dict(node)
+        if "children" in node:
+            node["children"] = rebase(node["children"], from_dir, to_dir)
+        elif "body" in node:
+            node["body"] = fix(node["body"])
+        out.append(node)
+    return out
+
+
+# ---------------------------------------------------------------- DOM + matching
+
+class Element:
+    __slots__ = ("tag", "id", "classes", "attrs", "parent", "prev", "index")
+
+    def __init__(self, tag, attrs, parent, prev, index):
+        self.tag = tag
+        self.attrs = {k: v or "" for k, v in attrs}
+        self.id = self.attrs.get("id")
+        self.classes = set(self.attrs.get("class", "").split())
+        self.parent = parent
+        self.prev = prev
+        self.index = index  # document order within <body>; -1 outside it
+
+
+class DomBuilder(HTMLParser):
+    """Light DOM: just what selector matching needs, plus script text and local stylesheets."""
+
+    def __init__(self):
+        super().__init__()
+        self.elements: List[Element] = []
+        self.stack: List[Element] = []
+        self.last_child: Dict[int, Element] = {}
+        self.scripts: List[str] = []
+        self.script_srcs: List[str] = []
+        self.in_script = False
+        self.body_count = 0
+
+    def handle_starttag(self, tag, attrs):
+        parent = self.stack[-1] if self.stack else None
+        in_body = tag == "body" or any(e.tag == "body" for e in self.stack)
+        el = Element(tag, attrs, parent, self.last_child.get(id(parent)), self.body_count if in_body else -1)
+        if in_body:
+            self.body_count += 1
+        self.last_child[id(parent)] = el
+        self.elements.append(el)
+        if tag == "script":
+            self.in_script = True
+            if el.attrs.get("src"):
+                self.script_srcs.append(el.attrs["src"])
+        if tag not in VOID:
+            self.stack.append(el)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID:
+            self.stack.pop()
+
+    def handle_endtag(self, tag):
+        self.in_script = False
+        for k in range(len(self.stack) - 1, -1, -1):
+            if self.stack[k].tag == tag:
+                del self.stack[k:]
+                return
+
+    def handle_data(self, data):
+        if self.in_script:
+            self.scripts.append(data)
+
+
+def parse_selector(sel: str):
+    """[(combinator, compound)] left to right, or None if the selector can't be parsed."""
+    parts, comb, i = [], None, 0
+    text = sel.strip()
+    while i < len(text):
+        if text[i] in " >+~":
+            j = i
+            while j < len(text) and text[j] in " >+~":
+                j += 1
+            comb = text[i:j].strip() or " "
+            i = j
+            continue
+        compound = {"tag": None, "ids": [], "classes": [], "attrs": [], "pseudos": []}
+        start = i
+        while i < len(text) and text[i] not in " >+~":
+            m = SIMPLE.match(text, i)
+            if not m or m.end() == i:
+                return None
+            if m.group("tag"):
+                compound["tag"] = m.group("tag").lower()
+            elif m.group("id"):
+                compound["ids"].append(m.group("id"))
+            elif m.group("cls"):
+                compound["classes"].append(m.group("cls"))
+            elif m.group("attr"):
+                a = ATTR_SEL.match(m.group("attr"))
+                if not a:
+                    return None
+                value = a.group(3)
+                if value and value[0] in "\"'":
+                    value = value[1:-1]
+                compound["attrs"].append((a.group(1).lower(), a.group(2), value))
+            else:
+                compound["pseudos"].append(m.group("pseudo").lower())
+            i = m.end()
+        if i == start:
+            return None
+        parts.append((comb if parts else None, compound))
+        comb = None
+    return parts or None
+
+
+def _match_attr(el: Element, name, op, value) -> bool:
+    if name not in el.attrs:
+        return False
+    actual = el.attrs[name]
+    if op is None:
+        return True
+    if op == "=":
+        return actual == value
+    if op == "~=":
+        return value in actual.split()
+    if op == "|=":
+        return actual == value or actual.startswith(value + "-")
+    if op == "^=":
+        return bool(value) and actual.startswith(value)
+    if op == "$=":
+        return bool(value) and actual.endswith(value)
+    return bool(value) and value in actual  # *=
+
+
+def match_compound(el: Element, c: dict) -> bool:
+    if c["tag"] not in (None, "*") and c["tag"] != el.tag:
+        return False
+    if any(i != el.id for i in c["ids"]):
+        return False
+    if not el.classes.issuperset(c["classes"]):
+        return False
+    if not all(_match_attr(el, *a) for a in c["attrs"]):
+        return False
+    if "root" in c["pseudos"] and el.tag != "html":
+        return False
+    return True  # every other pseudo-class/element is assumed to match
+
+
+def matches(el: Element, parts, k: int) -> bool:
+    comb, compound = parts[k]
+    if not match_compound(el, compound):
+        return False
+    if k == 0:
+        return True
+    if comb == ">":
+        return el.parent is not None and matches(el.parent, parts, k - 1)
+    if comb == "+":
+        return el.prev is not None and matches(el.prev, parts, k - 1)
+    step = (lambda e: e.parent) if comb == " " else (lambda e: e.prev)
+    other = step(el)
+    while other is not None:
+        if matches(other, parts, k - 1):
+            return True
+        other = step(other)
+    return False
+
+
+def script_tokens(builder: DomBuilder, page: Path) -> Set[str]:
+    """Identifiers inside string literals of the page's scripts (inline and local files)."""
+    texts = list(builder.scripts)
+    for src in builder.script_srcs:
+        path = (page.parent / src.split("?")[0]).resolve()
+        if "://" not in src and path.is_file():
+            texts.append(path.read_text(encoding="utf-8", errors="replace"))
+    tokens: Set[str] = set()
+    for text in texts:
+        for m in JS_STRING.finditer(text):
+            tokens.update(TOKEN.findall(next(g for g in m.groups() if g is not None)))
+    return tokens
+
+
+def selector_status(sel: str, elements: List[Element], dynamic: Set[str], fold: int) -> Tuple[bool, bool]:
+    """(keep, critical) for one selector on one page."""
+    parts = parse_selector(sel)
+    if parts is None:
+        return True, True
+    names = {n for _, c in parts for n in c["ids"] + c["classes"] + ([c["tag"]] if c["tag"] not in (None, "*") else [])}
+    critical = keep = False
+    last = len(parts) - 1
+    for el in elements:
+        if matches(el, parts, last):
+            keep = True
+            if el.index < fold:
+                critical = True
+                break
+    if not keep and names & dynamic:
+        keep = True
+    return keep, critical
+
+
+def prune(nodes: List[dict], status) -> Tuple[List[dict], List[dict]]:
+    """Return (kept, critical) node trees; ``status(selector)`` gives (keep, critical)."""
+    kept, crit = [], []
+    for node in nodes:
+        if "selectors" in node:
+            flags = [(s, *status(s)) for s in node["selectors"]]
+            keep_sel = [s for s, k, _ in flags if k]
+            crit_sel = [s for s, _, c in flags if c]
+            if keep_sel:
+                kept.append({"selectors": keep_sel, "body": node["body"]})
+            if crit_sel:
+                crit.append({"selectors": crit_sel, "body": node["body"]})
+        elif "children" in node:
+            k, c = prune(node["children"], status)
+            if k:
+                kept.append({**node, "children": k})
+            if c:
+                crit.append({**node, "children": c})
+        elif node["at"] != "keyframes":
+            kept.append(node)
+    # Keyframes go last, once we know which names the surviving rules use
+    for target in (kept, crit):
+        used = set(TOKEN.findall(" ".join(_bodies(target))))
+        for node in nodes:
+            if node.get("at") == "keyframes" and node["prelude"].split()[-1] in used:
+                target.append(node)
+    return kept, crit
+
+
+def _bodies(nodes: List[dict]):
+    for node in nodes:
+        if "children" in node:
+            yield from _bodies(node["children"])
+        elif "body" in node:
+            yield node["body"]
+
+
+# ---------------------------------------------------------------- pages
+
+def stylesheet_link(html: str, page_rel: str, root: Path):
+    """First local render-blocking stylesheet link: (tag text, site-relative css path)."""
+    for m in LINK_TAG.finditer(html):
+        attrs = {k.lower(): v[1:-1] for k, v in TAG_ATTR.findall(m.group(0))}
+        href = attrs.get("href", "")
+        if attrs.get("rel", "").lower() != "stylesheet" or "://" in href or href.startswith("//"):
+            continue
+        rel = posixpath.normpath(posixpath.join(posixpath.dirname(page_rel), href.split("?")[0]))
+        if (root / rel).is_file():
+            return m.group(0), rel
+    return None, None
+
+
+def process_page(root: Path, page_rel: str, fold: int, parsed: Dict[str, List[dict]]):
+    page = root / page_rel
+    html = page.read_text(encoding="utf-8")
+    tag, css_rel = stylesheet_link(html, page_rel, root)
+    if tag is None or "<style data-critical>" in html:
+        return None
+    if css_rel not in parsed:
+        parsed[css_rel] = parse_css((root / css_rel).read_text(encoding="utf-8"))
+    builder = DomBuilder()
+    builder.feed(html)
+    builder.close()
+    dynamic = script_tokens(builder, page)
+    cache: Dict[str, Tuple[bool, bool]] = {}
+
+    def status(sel):
+        if sel not in cache:
+            cache[sel] = selector_status(sel, builder.elements, dynamic, fold)
+        return cache[sel]
+
+    kept, crit = prune(parsed[css_rel], status)
+    css_dir = posixpath.dirname(css_rel)
+    pruned_css = serialize(rebase(kept, css_dir, OUT_DIR))
+    critical_css = serialize(rebase(crit, css_dir, posixpath.dirname(page_rel)))
+
+    slug = posixpath.splitext(page_rel)[0].replace("/", "-")
+    name = fingerprint_name(f"{OUT_DIR}/{slug}.css", pruned_css.encode())
+    (root / name).parent.mkdir(parents=True, exist_ok=True)
+    (root / name).write_text(pruned_css, encoding="utf-8")
+    href = posixpath.relpath(name, posixpath.dirname(page_rel) or ".")
+    replacement = (
+        f"<style data-critical>{critical_css}</style>\n"
+        f"    <link rel=\"preload\" href=\"{href}\" as=\"style\" onload=\"this.onload=null;this.rel='stylesheet'\">\n"
+        f"    <noscript><link rel=\"stylesheet\" href=\"{href}\"></noscript>"
+    )
+    page.write_text(html.replace(tag, replacement, 1), encoding="utf-8")
+    return {
+        "page": page_rel,
+        "original": (root / css_rel).stat().st_size,
+        "pruned": len(pruned_css.encode()),
+        "critical": len(critical_css.encode()),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Inline critical CSS and load a pruned per-page stylesheet.")
+    ap.add_argument("--root", type=Path, default=DEFAULT_ROOT, help="built site folder (default: dist/)")
+    ap.add_argument("--fold", type=int, default=FOLD, help="body elements treated as above the fold")
+    args = ap.parse_args()
+    root = args.root.resolve()
+    if root == ROOT:
+        sys.exit("Run this on a built copy (tools/fingerprint_assets.py), not the source tree")
+    if not root.is_dir():
+        sys.exit(f"{root} not found: run tools/fingerprint_assets.py first")
+
+    pages = sorted({p.relative_to(root).as_posix() for pat in PAGES for p in root.glob(pat)})
+    parsed: Dict[str, List[dict]] = {}
+    total_before = total_after = 0
+    for rel in pages:
+        r = process_page(root, rel, args.fold, parsed)
+        if r is None:
+            print(f"- {rel}: no local stylesheet (already processed?)")
+            continue
+        total_before += r["original"]
+        total_after += r["critical"]
+        print(f"✓ {rel}: blocking {r['original'] / 1024:.1f} KB -> {r['critical'] / 1024:.1f} KB inline, "
+              f"async sheet {r['pruned'] / 1024:.1f} KB ({1 - r['pruned'] / r['original']:.0%} pruned)")
+    if total_before:
+        print("-" * 30)
+        print(f"Render-blocking CSS: {total_before / 1024:.1f} KB -> {total_after / 1024:.1f} KB inline "
+              f"({(total_before - total_after) / 1024:.1f} KB saved)")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,13 +12,21 @@ Output:
 
 Notes:
   - Heuristics remove light checkerboard/white backgrounds and keep the subject.
-  - Files are sized to ~512px max in either dimension.
-  - Re-run anytime; it overwrites outputs.
+  - Files are sized to ~512px max in either dimension; JPEG sources are decoded
+    directly at a reduced size (image_io.load_image).
+  - Re-run anytime; outputs whose source is unchanged are skipped (build_cache.py).
 """
 import os
+import sys
 from pathlib import Path
 from typing import List
-from PIL import Image, ImageFilter
+from PIL import Image
+
+import bg_mask
+from image_io import load_image
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from build_cache import BuildCache  # noqa: E402
 
 INBOX = Path('icons/_INBOX')
 OUT = Path('icons')
@@ -38,25 +46,10 @@ def load_candidates() -> List[Path]:
 
 
 def clean_background(img: Image.Image) -> Image.Image:
-    rgb = img.convert('RGB')
-    w, h = rgb.size
-    px = rgb.load()
-    mask = Image.new('L', (w, h), 0)
-    m = mask.load()
-    for y in range(h):
-        for x in range(w):
-            r, g, b = px[x, y]
-            mx, mn = max(r, g, b), min(r, g, b)
-            sat = mx - mn
-            mean = (r + g + b) / 3
-            # Treat very light/low-sat (white or checkerboard) as background
-            bg = (mean > 230) or (mean > 200 and sat < 24)
-            m[x, y] = 0 if bg else 255
-    # Soften edges
-    mask = mask.filter(ImageFilter.MedianFilter(3)).filter(ImageFilter.GaussianBlur(1.2))
-    rgba = img.convert('RGBA')
-    rgba.putalpha(mask)
-    return rgba
+    # 1.2 px at the source's resolution; scaled down with a draft decode so the edge
+    # is softened as much, relative to the subject, as on a full decode
+    stored = img.info.get("source_size", img.size)
+    return bg_mask.clean_background(img, blur=1.2 * max(img.size) / max(stored))
 
 
 def resize_max(img: Image.Image, max_size: int = 512) -> Image.Image:
@@ -92,15 +85,22 @@ def main():
         if p not in ordered:
             ordered.append(p)
 
+    cache = BuildCache()
     for i, out_name in enumerate(OUT_FILES):
         if i >= len(ordered):
             break
-        img = Image.open(ordered[i])
+        out_path = OUT / out_name
+        key = cache.key(ordered[i], 'extract_symbols', {'max_size': 512, 'draft': True, 'blur': 'source-scaled'})
+        if cache.is_fresh(out_path, key):
+            print(f'Up to date: {out_path}')
+            continue
+        img = load_image(ordered[i], 512)  # decoded at (at least) 512px, upright
         img = clean_background(img)
         img = resize_max(img, 512)
-        out_path = OUT / out_name
         img.save(out_path, 'PNG')
+        cache.record(out_path, key)
         print(f'Saved {out_path} from {ordered[i].name}')
+    cache.save()
 
 if __name__ == '__main__':
     main()
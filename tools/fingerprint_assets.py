@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Build a deployable copy of the site in dist/ with content-hashed asset names.
+
+Usage:
+  python3 tools/fingerprint_assets.py                 # -> dist/
+  python3 tools/fingerprint_assets.py --out public
+  python3 serve.py --preview --precompress --root dist
+
+Output:
+  dist/<page>.html             pages with every asset reference rewritten
+  dist/assets/.../<name>.<hash>.<ext>, dist/styles.<hash>.css
+  dist/sitemap.xml, robots.txt, CNAME
+  dist/asset-manifest.json     {"styles.css": "styles.3f2a9c1e0b.css", ...}
+
+Notes:
+  - Only assets the pages actually reference are copied (hard links where possible),
+    so raw originals in assets/ never ship.
+  - The hash covers the file as deployed: a stylesheet's own url() references are
+    rewritten first, so changing an image also changes the hash of the CSS using it.
+  - Each page (and sitemap.xml) is rewritten in one streaming HTMLParser pass that
+    re-emits the source untouched apart from the reference values: src, href,
+    srcset, poster, data-src, site-absolute URLs in content= (og:image), and quoted
+    asset paths inside inline <script>/<style> and style= attributes.
+  - Pages keep their names (they are entry points); old cache busters like
+    styles.css?v=22 are dropped since the hash replaces them.
+  - serve.py --preview sends hashed names with immutable caching.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+import sys
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_OUT = ROOT / "dist"
+PAGES = ["index.html", "index_experimental.html", "pages/*.html"]
+PASSTHROUGH = ["robots.txt", "CNAME"]
+SITEMAP = "sitemap.xml"
+MANIFEST = "asset-manifest.json"
+HASH_LEN = 10
+
+URL_ATTRS = {"src", "href", "poster", "data-src"}
+SRCSET_ATTRS = {"srcset", "data-srcset", "imagesrcset"}
+ATTR_VALUE = re.compile(r'(\s)([\w:-]+)(\s*=\s*)("[^"]*"|\'[^\']*\')', re.DOTALL)
+CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+QUOTED_PATH = re.compile(r"""(['"])([^'"\s<>]+\.[A-Za-z0-9]{2,5})\1""")
+
+
+def site_host() -> str:
+    cname = ROOT / "CNAME"
+    return cname.read_text().strip() if cname.exists() else ""
+
+
+def fingerprint_name(rel: str, data: bytes) -> str:
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LEN]
+    stem, ext = posixpath.splitext(rel)
+    return f"{stem}.{digest}{ext}"
+
+
+class Fingerprinter:
+    """Maps site-relative asset paths to fingerprinted copies in the output folder."""
+
+    def __init__(self, out: Path, host: str):
+        self.out = out
+        self.host = host
+        self.manifest: Dict[str, str] = {}
+        self.missing: Dict[str, List[str]] = {}
+
+    def asset(self, rel: str) -> str | None:
+        """Fingerprint (once) and return the new site-relative path, or None if not an asset."""
+        if rel in self.manifest:
+            return self.manifest[rel]
+        src = ROOT / rel
+        if not src.is_file() or src.suffix.lower() in {".html", ".htm"} or rel == SITEMAP:
+            return None
+        data = src.read_bytes()
+        if src.suffix.lower() == ".css":
+            text = self.rewrite_css(data.decode("utf-8"), posixpath.dirname(rel))
+            data = text.encode("utf-8")
+        name = fingerprint_name(rel, data)
+        dest = self.out / name
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if src.suffix.lower() == ".css":
+            dest.write_bytes(data)
+        else:
+            try:
+                os.link(src, dest)
+            except OSError:
+                shutil.copy2(src, dest)
+        self.manifest[rel] = name
+        return name
+
+    def rewrite_url(self, url: str, base_dir: str, where: str) -> str:
+        """Rewrite one reference found in a file living in ``base_dir`` (site-relative)."""
+        parts = urlsplit(url.strip())
+        if parts.scheme in ("http", "https") and parts.netloc == self.host and self.host:
+            rel = parts.path.lstrip("/")
+            new = self.asset(rel) if rel else None
+            return f"{parts.scheme}://{parts.netloc}/{new}" if new else url
+        if parts.scheme or parts.netloc or not parts.path or url.startswith(("#", "data:")):
+            return url
+        if parts.path.startswith("/"):
+            rel = posixpath.normpath(parts.path.lstrip("/"))
+        else:
+            rel = posixpath.normpath(posixpath.join(base_dir, parts.path))
+        if rel.startswith(".."):
+            return url
+        new = self.asset(rel)
+        if new is None:
+            if not (ROOT / rel).exists():
+                self.missing.setdefault(rel, []).append(where)
+            return url
+        if parts.path.startswith("/"):
+            out = "/" + new
+        else:
+            out = posixpath.relpath(new, base_dir or ".")
+        return out + (f"#{parts.fragment}" if parts.fragment else "")
+
+    def rewrite_srcset(self, value: str, base_dir: str, where: str) -> str:
+        candidates = []
+        for candidate in value.split(","):
+            bits = candidate.strip().split(None, 1)
+            if bits:
+                bits[0] = self.rewrite_url(bits[0], base_dir, where)
+                candidates.append(" ".join(bits))
+        return ", ".join(candidates)
+
+    def rewrite_css(self, text: str, base_dir: str, where: str = "css") -> str:
+        return CSS_URL.sub(
+            lambda m: f"url({m.group(1)}{self.rewrite_url(m.group(2), base_dir, where)}{m.group(1)})", text)
+
+    def rewrite_script(self, text: str, base_dir: str, where: str) -> str:
+        """Quoted literals that resolve to a local asset (mirrorImg.src = '...png')."""
+
+        def sub(m):
+            if "://" in m.group(2):  # JSON-LD "image": "https://<host>/assets/..."
+                return m.group(1) + self.rewrite_url(m.group(2), base_dir, where) + m.group(1)
+            rel = posixpath.normpath(posixpath.join(base_dir, m.group(2)))
+            if not (ROOT / rel).is_file():
+                return m.group(0)
+            return m.group(1) + self.rewrite_url(m.group(2), base_dir, where) + m.group(1)
+
+        return QUOTED_PATH.sub(sub, text)
+
+
+class ReferenceRewriter(HTMLParser):
+    """Streams a document back out unchanged except for its asset references."""
+
+    def __init__(self, fp: Fingerprinter, rel: str):
+        super().__init__(convert_charrefs=False)
+        self.fp = fp
+        self.rel = rel
+        self.base_dir = posixpath.dirname(rel)
+        self.out: List[str] = []
+        self.raw_text_tag = None  # inside <script>/<style>
+        self.in_loc = False
+
+    def rewrite_attr(self, m):
+        space, name, eq, quoted = m.groups()
+        quote, value = quoted[0], quoted[1:-1]
+        key = name.lower()
+        if key in URL_ATTRS:
+            value = self.fp.rewrite_url(value, self.base_dir, self.rel)
+        elif key in SRCSET_ATTRS:
+            value = self.fp.rewrite_srcset(value, self.base_dir, self.rel)
+        elif key == "content" and value.startswith(("http://", "https://")):
+            value = self.fp.rewrite_url(value, self.base_dir, self.rel)
+        elif key == "style":
+            value = self.fp.rewrite_css(value, self.base_dir, self.rel)
+        return f"{space}{name}{eq}{quote}{value}{quote}"
+
+    def handle_starttag(self, tag, attrs):
+        self.out.append(ATTR_VALUE.sub(self.rewrite_attr, self.get_starttag_text()))
+        if tag in ("script", "style"):
+            self.raw_text_tag = tag
+        self.in_loc = tag in ("loc", "image:loc")
+
+    def handle_startendtag(self, tag, attrs):
+        self.out.append(ATTR_VALUE.sub(self.rewrite_attr, self.get_starttag_text()))
+
+    def handle_endtag(self, tag):
+        self.raw_text_tag = None
+        self.in_loc = False
+        self.out.append(f"</{tag}>")
+
+    def handle_data(self, data):
+        if self.raw_text_tag == "style":
+            data = self.fp.rewrite_css(data, self.base_dir, self.rel)
+        elif self.raw_text_tag == "script":
+            data = self.fp.rewrite_script(data, self.base_dir, self.rel)
+        elif self.in_loc:
+            data = self.fp.rewrite_url(data, self.base_dir, self.rel)
+        self.out.append(data)
+
+    def handle_entityref(self, name):
+        self.out.append(f"&{name};")
+
+    def handle_charref(self, name):
+        self.out.append(f"&#{name};")
+
+    def handle_comment(self, data):
+        self.out.append(f"<!--{data}-->")
+
+    def handle_decl(self, decl):
+        self.out.append(f"<!{decl}>")
+
+    def handle_pi(self, data):
+        self.out.append(f"<?{data}>")
+
+    def unknown_decl(self, data):
+        self.out.append(f"<![{data}]>")
+
+
+def rewrite_file(fp: Fingerprinter, rel: str, chunk_size: int = 64 * 1024) -> str:
+    """Rewrite one page/sitemap in a single streaming pass; returns the new text."""
+    parser = ReferenceRewriter(fp, rel)
+    with open(ROOT / rel, encoding="utf-8") as f:
+        for chunk in iter(lambda: f.read(chunk_size), ""):
+            parser.feed(chunk)
+    parser.close()
+    return "".join(parser.out)
+
+
+def build(out: Path) -> Dict[str, str]:
+    if out.exists():
+        shutil.rmtree(out)
+    out.mkdir(parents=True)
+    fp = Fingerprinter(out, site_host())
+
+    pages = sorted({p.relative_to(ROOT).as_posix() for pat in PAGES for p in ROOT.glob(pat)})
+    for rel in pages + ([SITEMAP] if (ROOT / SITEMAP).exists() else []):
+        dest = out / rel
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.write_text(rewrite_file(fp, rel), encoding="utf-8")
+        print(f"✓ {rel}")
+    for rel in PASSTHROUGH:
+        if (ROOT / rel).exists():
+            shutil.copy2(ROOT / rel, out / rel)
+
+    (out / MANIFEST).write_text(json.dumps(dict(sorted(fp.manifest.items())), indent=2) + "\n")
+    for rel, where in sorted(fp.missing.items()):
+        print(f"✗ missing: {rel} (referenced by {', '.join(sorted(set(where)))})")
+    size = sum((ROOT / rel).stat().st_size for rel in fp.manifest)
+    print("-" * 30)
+    print(f"{len(pages)} page(s), {len(fp.manifest)} fingerprinted asset(s) ({size / 1e6:.1f} MB) -> {out}")
+    return fp.manifest
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Copy the site to dist/ with content-hashed asset names.")
+    ap.add_argument("--out", type=Path, default=DEFAULT_OUT, help="output folder (default: dist/)")
+    args = ap.parse_args()
+    out = args.out.resolve()
+    if out == ROOT or ROOT.is_relative_to(out):
+        sys.exit("Refusing to write over the source tree")
+    build(out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Add intrinsic size and loading hints to every <img> in the site's pages.
+
+Usage:
+  python3 tools/image_hints.py              # rewrite index*.html and pages/*.html in place
+  python3 tools/image_hints.py --dry-run    # list the changes only
+  python3 tools/image_hints.py --eager 3 --verify
+
+Per <img> with a local src (attributes already present are left alone, so re-running is safe):
+  - width/height from the image header (Pillow reads only the header, no pixel
+    decoding; EXIF rotation is honored), so the browser reserves space up front;
+  - decoding="async" everywhere;
+  - the page's hero (first non-icon image) gets fetchpriority="high";
+  - the next --eager non-icon images load normally, later ones get loading="lazy";
+  - icons (assets/icons/) are small fixed UI chrome and are never lazy-loaded.
+
+--verify loads every page in headless Chrome (screenshot_website.py --metrics) at desktop
+and mobile sizes and fails on unsized images, lazy images in the first viewport, a lazy
+LCP image or a layout shift above --max-cls.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import posixpath
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from make_responsive_images import ATTR, IMG_TAG, source_size
+
+ROOT = Path(__file__).resolve().parents[1]
+PAGES = ["index.html", "index_experimental.html", "pages/*.html"]
+ICON_PREFIX = "assets/icons/"
+EAGER = 2  # non-icon images after the hero that still load eagerly
+MAX_CLS = 0.1
+
+
+def tag_attrs(tag: str) -> Dict[str, str | None]:
+    attrs: Dict[str, str | None] = {}
+    for name, value in ATTR.findall(tag[4:-1]):
+        attrs.setdefault(name.lower(), value if value else None)
+    return attrs
+
+
+def add_attrs(tag: str, new: List[Tuple[str, str]]) -> str:
+    """Append attributes before the tag's closing bracket, keeping the rest byte-for-byte."""
+    if not new:
+        return tag
+    end = -2 if tag.endswith("/>") else -1
+    head = tag[:end].rstrip()
+    return head + "".join(f' {k}="{v}"' for k, v in new) + (" />" if end == -2 else ">")
+
+
+def image_size(rel: str, sizes: Dict[str, Tuple[int, int] | None]) -> Tuple[int, int] | None:
+    if rel not in sizes:
+        try:
+            sizes[rel] = source_size(ROOT / rel)
+        except (OSError, ValueError):
+            sizes[rel] = None  # missing or not a raster image
+    return sizes[rel]
+
+
+def rewrite_page(page: Path, eager: int, sizes: Dict[str, Tuple[int, int] | None]) -> Tuple[str, List[str]]:
+    """Return (new html, change notes) for one page."""
+    page_dir = posixpath.dirname(page.relative_to(ROOT).as_posix())
+    html = page.read_text(encoding="utf-8")
+    notes: List[str] = []
+    seen_content = 0  # non-icon images so far
+
+    def sub(m: re.Match) -> str:
+        nonlocal seen_content
+        tag = m.group(0)
+        attrs = tag_attrs(tag)
+        src = attrs.get("src") or ""
+        if not src or "://" in src or src.startswith("data:"):
+            return tag
+        rel = posixpath.normpath(posixpath.join(page_dir, src.split("?")[0]))
+        icon = rel.startswith(ICON_PREFIX)
+        new: List[Tuple[str, str]] = []
+        size = image_size(rel, sizes)
+        if size and "width" not in attrs and "height" not in attrs:
+            new += [("width", str(size[0])), ("height", str(size[1]))]
+        elif size is None:
+            notes.append(f"✗ {rel}: can't read size")
+        if "decoding" not in attrs:
+            new.append(("decoding", "async"))
+        if not icon:
+            if seen_content == 0:
+                if "fetchpriority" not in attrs and "loading" not in attrs:
+                    new.append(("fetchpriority", "high"))
+            elif seen_content > eager and "loading" not in attrs:
+                new.append(("loading", "lazy"))
+            seen_content += 1
+        if new:
+            notes.append(f"  {rel}: " + " ".join(f"{k}={v}" for k, v in new))
+        return add_attrs(tag, new)
+
+    return IMG_TAG.sub(sub, html), notes
+
+
+def verify(max_cls: float) -> bool:
+    """Load every page in headless Chrome and check the hints did their job."""
+    sys.path.insert(0, str(ROOT))
+    import screenshot_website as shots  # noqa: E402 (needs selenium + Chrome)
+
+    os.makedirs("screenshots", exist_ok=True)
+    metrics: Dict[str, dict] = {}
+    viewports = [shots.parse_viewport("desktop"), shots.parse_viewport("mobile")]
+    with shots.local_server() as base_url:
+        shots.run_screenshots(base_url, viewports, metrics=metrics)
+    ok = bool(metrics)
+    for name, m in sorted(metrics.items()):
+        problems = [f"unsized: {src}" for src in m["unsized"]]
+        problems += [f"lazy in first viewport: {src}" for src in m["lazy_in_view"]]
+        lcp = m["lcp"] or {}
+        if lcp.get("url") and any(i["loading"] == "lazy" and lcp["url"].endswith(i["src"].lstrip("./"))
+                                  for i in m["images"]):
+            problems.append(f"LCP image is lazy: {lcp['url']}")
+        if m["cls"] > max_cls:
+            problems.append(f"CLS {m['cls']:.3f} > {max_cls}")
+        ok &= not problems
+        print(f"{'✗' if problems else '✓'} {name}: LCP {lcp.get('ms', 0) / 1000:.2f}s, CLS {m['cls']:.3f}")
+        for p in problems:
+            print(f"    {p}")
+    return ok
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Add width/height, lazy-loading and decode hints to <img> tags.")
+    ap.add_argument("--eager", type=int, default=EAGER, help="non-icon images after the hero to load eagerly")
+    ap.add_argument("--dry-run", action="store_true", help="print the changes without writing")
+    ap.add_argument("--verify", action="store_true", help="check the result in headless Chrome afterwards")
+    ap.add_argument("--max-cls", type=float, default=MAX_CLS, help="largest acceptable layout shift for --verify")
+    args = ap.parse_args()
+
+    sizes: Dict[str, Tuple[int, int] | None] = {}
+    pages = sorted({p for pat in PAGES for p in ROOT.glob(pat)})
+    changed = 0
+    for page in pages:
+        html, notes = rewrite_page(page, args.eager, sizes)
+        if not notes:
+            continue
+        print(page.relative_to(ROOT))
+        for note in notes:
+            print(note)
+        if not args.dry_run and html != page.read_text(encoding="utf-8"):
+            page.write_text(html, encoding="utf-8")
+            changed += 1
+    print(f"{changed} page(s) updated, {len(sizes)} image header(s) read")
+    if args.verify and not verify(args.max_cls):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
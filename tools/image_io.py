@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Shared image loader for the tools: reduced-size JPEG decoding, EXIF rotation and a
+predictable mode.
+
+Usage (library):
+  from image_io import load_image
+  img = load_image(path, 512)              # longest side will still be >= 512
+  img = load_image(path, (96, None), "RGB") # width >= 96, any height
+
+Usage (self-check / benchmark):
+  python3 tools/image_io.py IMG... [--size 512]
+
+Notes:
+  - When the caller will downscale anyway, JPEGs are decoded with Image.draft(), which
+    lets libjpeg's DCT scaling produce a 1/2, 1/4 or 1/8 size image directly: the
+    largest power-of-two reduction that still covers the requested size. A 12 MP photo
+    capped at 512 px decodes at 1/8 scale (64x fewer pixels). Other formats load normally.
+  - EXIF orientation is applied once, so callers always see the displayed orientation.
+  - The mode is normalized: ``mode`` if given, otherwise RGBA for anything with
+    transparency (P/LA/PA/tRNS) and RGB for everything else.
+  - ``img.info["source_size"]`` keeps the stored (pre-draft) size, for callers that
+    scale pixel-based parameters with the decode.
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import time
+from pathlib import Path
+from typing import Tuple, Union
+
+from PIL import Image, ImageOps
+
+Size = Union[int, Tuple[Union[int, None], Union[int, None]], None]
+
+ROTATED = (5, 6, 7, 8)  # EXIF orientations that swap width and height
+
+
+def draft_box(stored: Tuple[int, int], size: Size, orientation: int | None) -> Tuple[int, int] | None:
+    """The minimum stored-orientation (w, h) the decode must cover, or None for full size."""
+    if size is None:
+        return None
+    w, h = stored
+    if isinstance(size, int):
+        s = size / max(w, h)
+        return (max(1, math.ceil(w * s)), max(1, math.ceil(h * s)))
+    bw, bh = size
+    if orientation in ROTATED:
+        bw, bh = bh, bw
+    return (bw or 1, bh or 1)
+
+
+def normalize_mode(img: Image.Image, mode: str | None = None) -> Image.Image:
+    if mode:
+        return img if img.mode == mode else img.convert(mode)
+    if img.mode in ("RGB", "RGBA"):
+        return img
+    if img.mode in ("P", "PA", "LA", "La") or "transparency" in img.info:
+        return img.convert("RGBA")
+    return img.convert("RGB")
+
+
+def load_image(path, size: Size = None, mode: str | None = None) -> Image.Image:
+    """Open ``path`` decoded at the smallest cheap size covering ``size``, upright, in a fixed mode.
+
+    ``size`` is an int (minimum longest side) or a (width, height) box in displayed
+    orientation where either side may be None. The result can still be larger than
+    ``size``; resize it afterwards as usual.
+    """
+    with Image.open(path) as im:
+        stored = im.size
+        orientation = im.getexif().get(0x0112)
+        box = draft_box(stored, size, orientation)
+        if box and im.format == "JPEG":
+            im.draft("L" if mode == "L" else None, box)
+        im.load()
+        img = ImageOps.exif_transpose(im)
+        img = normalize_mode(img, mode)
+        if img is im:
+            img = im.copy()
+    img.info["source_size"] = stored
+    return img
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare full decodes with load_image() draft decodes.")
+    ap.add_argument("images", nargs="+", type=Path)
+    ap.add_argument("--size", type=int, default=512, help="target longest side")
+    args = ap.parse_args()
+
+    for path in args.images:
+        t0 = time.perf_counter()
+        with Image.open(path) as im:
+            full = ImageOps.exif_transpose(im)
+            full.load()
+        t1 = time.perf_counter()
+        small = load_image(path, args.size)
+        t2 = time.perf_counter()
+        ok = max(small.size) >= min(args.size, max(full.size)) and \
+            abs(small.size[0] / small.size[1] - full.size[0] / full.size[1]) < 0.02
+        print(f"{'✓' if ok else '✗'} {path.name}: {full.size[0]}x{full.size[1]} in {(t1 - t0) * 1000:.0f} ms -> "
+              f"{small.size[0]}x{small.size[1]} {small.mode} in {(t2 - t1) * 1000:.0f} ms "
+              f"({(t1 - t0) / max(t2 - t1, 1e-9):.1f}x faster, "
+              f"{full.size[0] * full.size[1] / (small.size[0] * small.size[1]):.0f}x fewer pixels)")
+
+
+if __name__ == "__main__":
+    main()
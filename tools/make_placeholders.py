@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Generate tiny blurred placeholders (LQIP) for the portfolio and inline them in the HTML.
+
+Usage:
+  python3 tools/make_placeholders.py             # placeholders + rewrite pages/*.html
+  python3 tools/make_placeholders.py --width 24 --no-html
+
+Each image in assets/portfolio/ becomes a ~20 px wide, slightly blurred WebP, embedded as
+a data: URI background on its <img> (class "lqip"), so the grid shows a soft preview
+instead of a blank box until the real image arrives. No JavaScript is involved.
+
+Notes:
+  - JPEGs are decoded with Image.draft() (image_io.load_image), letting libjpeg's DCT
+    scaling produce a 1/8 size image directly; the full-resolution pixels are never
+    materialized. EXIF rotation is applied, matching the responsive derivatives.
+  - Sources fan out over a process pool.
+  - Re-running replaces the previous placeholder; other inline styles are kept.
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import io
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Tuple
+
+from PIL import Image, ImageFilter
+
+from image_hints import add_attrs, tag_attrs
+from image_io import load_image
+from make_responsive_images import IMAGE_EXTS, IMG_TAG, PAGES, SRC_DIR, SRC_STEM
+
+WIDTH = 20
+BLUR = 1.0
+QUALITY = 40
+PLACEHOLDER = re.compile(r"background-image:\s*url\(data:image/[^)]*\);?\s*")
+
+
+def placeholder(src: Path, width: int = WIDTH, blur: float = BLUR, quality: int = QUALITY) -> Tuple[str, str]:
+    """Return (stem, data URI) for one source image."""
+    img = load_image(src, (width * 4, None), "RGB")  # JPEG: decoded at 1/2..1/8 scale
+    w, h = img.size
+    img = img.resize((width, max(1, round(h * width / w))), Image.BOX, reducing_gap=2.0)
+    if blur:
+        img = img.filter(ImageFilter.GaussianBlur(blur))
+    buf = io.BytesIO()
+    img.save(buf, "WEBP", quality=quality, method=6)
+    return src.stem, "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def generate(width: int, blur: float, quality: int, workers: int | None = None) -> Dict[str, str]:
+    sources = sorted(p for p in SRC_DIR.iterdir() if p.suffix.lower() in IMAGE_EXTS)
+    n = len(sources)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        results = pool.map(placeholder, sources, [width] * n, [blur] * n, [quality] * n)
+        return dict(results)
+
+
+def rewrite_tag(tag: str, uris: Dict[str, str]) -> str:
+    attrs = tag_attrs(tag)
+    m = SRC_STEM.search(attrs.get("src") or "")
+    if not m or m.group(1) not in uris:
+        return tag
+    style = PLACEHOLDER.sub("", attrs.get("style") or "").strip()
+    if style and not style.endswith(";"):
+        style += ";"
+    style = f"{style} background-image: url({uris[m.group(1)]});".strip()
+    classes = (attrs.get("class") or "").split()
+    if "lqip" not in classes:
+        classes.append("lqip")
+    for name, value in (("class", " ".join(classes)), ("style", style)):
+        if name in attrs:
+            tag = re.sub(rf'(\s{name}=")[^"]*(")', lambda mm: mm.group(1) + value + mm.group(2), tag, count=1)
+        else:
+            tag = add_attrs(tag, [(name, value)])
+    return tag
+
+
+def rewrite_html(path: Path, uris: Dict[str, str]) -> int:
+    original = path.read_text(encoding="utf-8")
+    count = 0
+
+    def sub(m: re.Match) -> str:
+        nonlocal count
+        new = rewrite_tag(m.group(0), uris)
+        count += new != m.group(0)
+        return new
+
+    text = IMG_TAG.sub(sub, original)
+    if text != original:
+        path.write_text(text, encoding="utf-8")
+    return count
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Inline blurred placeholders for the portfolio images.")
+    ap.add_argument("--width", type=int, default=WIDTH, help="placeholder width in pixels")
+    ap.add_argument("--blur", type=float, default=BLUR, help="Gaussian blur radius at placeholder size")
+    ap.add_argument("--quality", type=int, default=QUALITY, help="WebP quality")
+    ap.add_argument("--no-html", action="store_true", help="only generate and report sizes")
+    ap.add_argument("--workers", type=int, default=None)
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    uris = generate(args.width, args.blur, args.quality, args.workers)
+    total = sum(len(u) for u in uris.values())
+    print(f"✓ {len(uris)} placeholder(s) in {time.perf_counter() - t0:.2f}s, "
+          f"{total / 1024:.1f} KB inline ({total / max(1, len(uris)):.0f} B each)")
+    if args.no_html:
+        return
+    for page in sorted(PAGES.glob("*.html")):
+        n = rewrite_html(page, uris)
+        if n:
+            print(f"Updated {n} <img> tag(s) in {page}")
+
+
+if __name__ == "__main__":
+    main()
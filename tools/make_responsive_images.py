@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Generate responsive WebP (and optionally AVIF) derivatives for the portfolio and
+wire them into the HTML with srcset/sizes and intrinsic width/height.
+
+Usage:
+  python3 tools/make_responsive_images.py             # derivatives + rewrite pages/*.html
+  python3 tools/make_responsive_images.py --avif      # also AVIF, via <picture>
+  python3 tools/make_responsive_images.py --no-html   # derivatives only
+
+Output:
+  assets/portfolio/responsive/<stem>-<width>w.webp (and .avif)
+  <img> tags in pages/*.html that point at assets/portfolio/<stem>.* are rewritten.
+
+Notes:
+  - Widths above the source width are skipped (no upscaling); the source width is
+    emitted instead so the largest candidate is always full quality.
+  - Each source is decoded once (reduced-size JPEG decode, EXIF-transposed; see
+    image_io.py) and resized to every width.
+  - Sources fan out over a process pool; unchanged sources are skipped (build_cache.py).
+  - Re-running the HTML rewrite is safe: already-rewritten tags are recognized.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from build_cache import BuildCache  # noqa: E402
+from image_io import load_image  # noqa: E402
+
+SRC_DIR = Path("assets/portfolio")
+OUT_DIR = SRC_DIR / "responsive"
+PAGES = Path("pages")
+WIDTHS = [480, 960, 1600, 2400]
+SIZES = "(max-width: 768px) 100vw, 50vw"
+SAVE_OPTS = {"webp": {"quality": 78, "method": 6}, "avif": {"quality": 55}}
+IMAGE_EXTS = {".jpg", ".jpeg", ".png"}
+
+IMG_TAG = re.compile(r"<img\b[^>]*>", re.IGNORECASE)
+PICTURE = re.compile(r"<picture>\s*(?:<source\b[^>]*>\s*)*(<img\b[^>]*>)\s*</picture>", re.IGNORECASE)
+ATTR = re.compile(r'\s([\w-]+)(?:="([^"]*)")?')
+SRC_STEM = re.compile(r"assets/portfolio/(?:responsive/)?([^/\"]+?)(?:-\d+w)?\.(?:jpe?g|png|webp|avif)$",
+                      re.IGNORECASE)
+
+
+def target_widths(src_width: int, widths: List[int]) -> List[int]:
+    out = [w for w in widths if w < src_width]
+    if len(out) < len(widths):
+        out.append(src_width)
+    return out
+
+
+def derivative_path(stem: str, width: int, fmt: str) -> Path:
+    return OUT_DIR / f"{stem}-{width}w.{fmt}"
+
+
+def source_size(src: Path) -> Tuple[int, int]:
+    """Displayed (width, height) of ``src`` from its header, honoring EXIF rotation."""
+    with Image.open(src) as im:
+        w, h = im.size
+        if im.getexif().get(0x0112) in (5, 6, 7, 8):
+            w, h = h, w
+    return w, h
+
+
+def build_one(src: Path, widths: List[int], formats: List[str]) -> Tuple[Path, List[Path]]:
+    """Write every width/format derivative of ``src``; returns (src, outputs)."""
+    w, h = source_size(src)
+    # JPEGs decode straight at the smallest DCT scale still covering the largest width
+    img = load_image(src, (max(target_widths(w, widths)), None), "RGB")
+    outputs = []
+    for tw in sorted(target_widths(w, widths), reverse=True):
+        th = round(h * tw / w)
+        resized = img if img.size == (tw, th) else img.resize((tw, th), Image.LANCZOS, reducing_gap=3.0)
+        for fmt in formats:
+            out = derivative_path(src.stem, tw, fmt)
+            resized.save(out, fmt.upper(), **SAVE_OPTS[fmt])
+            outputs.append(out)
+    return src, outputs
+
+
+def generate(widths: List[int], formats: List[str], workers: int | None = None) -> Dict[str, Tuple[int, int]]:
+    """Build derivatives for every portfolio source; returns {stem: (width, height)}."""
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+    sources = sorted(p for p in SRC_DIR.iterdir() if p.suffix.lower() in IMAGE_EXTS)
+    cache = BuildCache()
+    params = {"widths": widths, "formats": formats, "save": SAVE_OPTS}
+    dims: Dict[str, Tuple[int, int]] = {}
+    jobs = []
+    for src in sources:
+        dims[src.stem] = source_size(src)
+        key = cache.key(src, "responsive", params)
+        # The largest derivative stands in for the whole set
+        largest = derivative_path(src.stem, max(target_widths(dims[src.stem][0], widths)), formats[-1])
+        if not cache.is_fresh(largest, key):
+            jobs.append((src, key, largest))
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            futures = [(pool.submit(build_one, src, widths, formats), key, largest)
+                       for src, key, largest in jobs]
+            for fut, key, largest in futures:
+                src, outputs = fut.result()
+                cache.record(largest, key)
+                print(f"✓ {src} → {len(outputs)} file(s)")
+    cache.save()
+    print(f"{len(jobs)} built, {len(sources) - len(jobs)} up to date")
+    return dims
+
+
+def _render_img(attrs: Dict[str, str | None], order: List[str]) -> str:
+    parts = []
+    for name in order:
+        value = attrs[name]
+        parts.append(name if value is None else f'{name}="{value}"')
+    return "<img " + " ".join(parts) + ">"
+
+
+def rewrite_tag(tag: str, dims: Dict[str, Tuple[int, int]], widths: List[int], formats: List[str],
+                sizes: str) -> str | None:
+    """Return the responsive markup for one <img> tag, or None if it isn't a portfolio image."""
+    order: List[str] = []
+    attrs: Dict[str, str | None] = {}
+    for name, value in ATTR.findall(tag[4:-1]):
+        if name not in attrs:
+            order.append(name)
+        attrs[name] = value if value else None
+    m = SRC_STEM.search(attrs.get("src") or "")
+    if not m or m.group(1) not in dims:
+        return None
+    stem = m.group(1)
+    w, h = dims[stem]
+    prefix = attrs["src"][: attrs["src"].index("assets/portfolio/")]
+    cand = sorted(target_widths(w, widths))
+
+    def srcset(fmt: str) -> str:
+        return ", ".join(f"{prefix}{derivative_path(stem, tw, fmt).as_posix()} {tw}w" for tw in cand)
+
+    fallback = min(cand, key=lambda tw: abs(tw - 960))
+    attrs["src"] = f"{prefix}{derivative_path(stem, fallback, 'webp').as_posix()}"
+    attrs["srcset"] = srcset("webp")
+    attrs["sizes"] = sizes
+    attrs["width"] = str(w)
+    attrs["height"] = str(h)
+    for name in ("srcset", "sizes", "width", "height"):
+        if name not in order:
+            order.append(name)
+    img = _render_img(attrs, order)
+    if "avif" not in formats:
+        return img
+    return f'<picture><source type="image/avif" srcset="{srcset("avif")}" sizes="{sizes}">{img}</picture>'
+
+
+def rewrite_html(path: Path, dims: Dict[str, Tuple[int, int]], widths: List[int], formats: List[str],
+                 sizes: str) -> int:
+    original = path.read_text(encoding="utf-8")
+    count = 0
+
+    def sub(m: re.Match) -> str:
+        nonlocal count
+        new = rewrite_tag(m.group(0), dims, widths, formats, sizes)
+        if new is None:
+            return m.group(0)
+        count += 1
+        return new
+
+    # Unwrap earlier <picture> output first so --avif can be toggled between runs
+    text = PICTURE.sub(lambda m: m.group(1) if "assets/portfolio/" in m.group(1) else m.group(0), original)
+    text = IMG_TAG.sub(sub, text)
+    if text != original:
+        path.write_text(text, encoding="utf-8")
+    return count
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Responsive WebP/AVIF derivatives for the portfolio.")
+    ap.add_argument("--widths", default=",".join(map(str, WIDTHS)), help="comma-separated target widths")
+    ap.add_argument("--avif", action="store_true", help="also emit AVIF and wrap tags in <picture>")
+    ap.add_argument("--sizes", default=SIZES, help="sizes attribute for rewritten tags")
+    ap.add_argument("--no-html", action="store_true", help="skip rewriting pages/*.html")
+    ap.add_argument("--workers", type=int, default=None)
+    args = ap.parse_args()
+
+    widths = sorted(int(w) for w in args.widths.split(","))
+    formats = ["webp", "avif"] if args.avif else ["webp"]
+    dims = generate(widths, formats, args.workers)
+    if args.no_html:
+        return
+    for page in sorted(PAGES.glob("*.html")):
+        n = rewrite_html(page, dims, widths, formats, args.sizes)
+        if n:
+            print(f"Rewrote {n} <img> tag(s) in {page}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,58 @@
 #!/usr/bin/env python3
 """
-Quick-and-simple cutout for a parchment-background manuscript image to a cursor PNG.
+Quick-and-simple cutout for a parchment-background manuscript image to a cursor PNG set.
 
 Usage:
   python3 tools/make_snail_cursor.py [input_image] [output_png]
+  python3 tools/make_snail_cursor.py --sizes 32,48,64,96 --css-size 96
+  python3 tools/make_snail_cursor.py photo.jpg --check   # mask parity with the old loop
+  python3 tools/make_snail_cursor.py assets/icons/home.png assets/icons/cursor-glove.png --stylesheet styles.css
 
 Defaults:
   input_image: assets/icons/snail-source.png (or .jpg/.jpeg/.webp)
   output_png : assets/icons/snail-cursor.png
 
+Outputs (next to output_png):
+  snail-cursor.png                 96 px wide, as before
+  snail-cursor-{32,48,64,96}.png   one per --sizes width
+  snail-cursor-{N}@2x.png          double width, for high-DPI screens
+  snail-cursor.css                 .snail-cursor rules using image-set(), so each device
+                                   pixel ratio fetches the smallest file that is sharp
+  --stylesheet FILE writes those rules into FILE instead (between /* snail-cursor:start/end */
+  markers, replacing any previous copy, urls relative to FILE); that's how styles.css
+  gets the landing page's glove cursor.
+
 Notes:
   - This is a heuristic trim tuned for beige/white paper backgrounds.
-  - It removes near-paper pixels and keeps saturated/edge details.
-  - You can rerun safely; it will overwrite the output.
+  - It removes near-paper pixels and keeps saturated/edge details. A source that is
+    already transparent (like the keyed glove, tools/strip_bg_glove.py) uses its own alpha.
+  - The paper mask is whole-array NumPy, and the subject's bounding box is found on a
+    256 px copy first (draft-decoded for JPEGs, thumbnailed for everything else). The
+    cropped region is then brought down to the resolution the largest @2x cursor needs
+    before it is masked, so a large PNG source costs about as little as a JPEG.
+  - You can rerun safely; it will overwrite the outputs.
 """
 from __future__ import annotations
 
+import argparse
+import math
 import os
+import re
 import sys
-from typing import Tuple
+from typing import List, Tuple
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+from image_io import load_image
 
-from PIL import Image, ImageFilter, ImageOps
+SIZES = [32, 48, 64, 96]
+CSS_SIZE = 96  # .snail-cursor width in styles.css
+ANALYSIS = 256  # longest side of the copy used to locate the subject
+MARGIN = 0.02  # bbox padding (fraction of the image) so the blur isn't clipped
+CSS_START = "/* snail-cursor:start */"
+CSS_END = "/* snail-cursor:end */"
+HEADROOM = 1.1  # extra resolution for the crop: the 256 px box is only approximate
 
 
 def find_default_input() -> str | None:
@@ -36,32 +68,50 @@ def find_default_input() -> str | None:
     return None
 
 
+def paper_array(rgb: np.ndarray) -> np.ndarray:
+    """Return a bool array (H, W), True where an (H, W, 3) uint8 RGB array is parchment.
+
+    mean > 190 is evaluated as r+g+b > 570, so the result is bit-identical to the loop.
+    """
+    c = rgb.astype(np.int16)
+    total = c.sum(axis=2)
+    sat = c.max(axis=2) - c.min(axis=2)
+    return ((total > 570) & (sat < 35)) | (c > 225).all(axis=2)
+
+
+def raw_mask(img: Image.Image) -> Image.Image:
+    """Binary 'L' mask: 0 for parchment, 255 for the subject."""
+    m = np.where(paper_array(np.asarray(img.convert("RGB"))), 0, 255).astype(np.uint8)
+    return Image.fromarray(m, mode="L")
+
+
 def compute_mask(img: Image.Image) -> Image.Image:
-    # Work in RGB
+    if img.mode == "RGBA" and img.getextrema()[3][0] < 255:
+        return img.getchannel("A")  # already cut out
+    mask = raw_mask(img)
+    # Clean mask: blur a bit, then expand and soften edges
+    mask = mask.filter(ImageFilter.MedianFilter(size=3))
+    mask = mask.filter(ImageFilter.MaxFilter(size=3))
+    mask = mask.filter(ImageFilter.GaussianBlur(radius=1.2))
+    return mask
+
+
+def _reference_mask(img: Image.Image) -> Image.Image:
+    """The original per-pixel loop, kept only for --check."""
     rgb = img.convert("RGB")
     w, h = rgb.size
     px = rgb.load()
-
-    # Create mask keeping non-parchment areas
     mask = Image.new("L", (w, h), 0)
     m = mask.load()
-
     for y in range(h):
         for x in range(w):
             r, g, b = px[x, y]
-            # whiteness & low saturation (parchment-ish)
             mx = max(r, g, b)
             mn = min(r, g, b)
             sat = mx - mn
             mean = (r + g + b) / 3
-
             is_paper = (mean > 190 and sat < 35) or (r > 225 and g > 225 and b > 225)
             m[x, y] = 0 if is_paper else 255
-
-    # Clean mask: blur a bit, then expand and soften edges
-    mask = mask.filter(ImageFilter.MedianFilter(size=3))
-    mask = mask.filter(ImageFilter.MaxFilter(size=3))
-    mask = mask.filter(ImageFilter.GaussianBlur(radius=1.2))
     return mask
 
 
@@ -74,36 +124,145 @@ def trim_to_content(img: Image.Image, mask: Image.Image) -> Tuple[Image.Image, I
     return img2, mask2
 
 
-def make_cursor(input_path: str, output_path: str, out_width: int = 96):
-    img = Image.open(input_path)
+def subject_box(input_path: str) -> Tuple[float, float, float, float] | None:
+    """Subject bbox as fractions of the (upright) image, from a small draft decode."""
+    small = load_image(input_path, ANALYSIS)  # RGBA if the source has transparency
+    small.thumbnail((ANALYSIS, ANALYSIS), Image.LANCZOS)  # draft only shrinks JPEGs
+    bbox = compute_mask(small).getbbox()
+    if not bbox:
+        return None
+    w, h = small.size
+    l, t, r, b = bbox
+    return (max(0.0, l / w - MARGIN), max(0.0, t / h - MARGIN),
+            min(1.0, r / w + MARGIN), min(1.0, b / h + MARGIN))
+
+
+def load_subject(input_path: str, out_width: int) -> Tuple[Image.Image, Image.Image]:
+    """Decode just enough resolution for the subject to be ``out_width`` wide, then cut it out."""
+    box = subject_box(input_path)
+    # Width of the whole image at which the subject (the box without its padding) is out_width
+    frac_w = max(box[2] - box[0] - 2 * MARGIN, 1e-3) if box else 1.0
+    full_w = math.ceil(out_width / frac_w * HEADROOM)
+    img = load_image(input_path, (full_w, None))
+    w, h = img.size
+    if box:
+        img = img.crop((math.floor(box[0] * w), math.floor(box[1] * h),
+                        math.ceil(box[2] * w), math.ceil(box[3] * h)))
+    if w > full_w:
+        scale = full_w / w
+        img = img.resize((max(1, round(img.size[0] * scale)), max(1, round(img.size[1] * scale))),
+                         Image.LANCZOS)
     mask = compute_mask(img)
-    img, mask = trim_to_content(img, mask)
+    return trim_to_content(img, mask)
+
 
-    # Resize to width
+def render(img: Image.Image, mask: Image.Image, out_width: int) -> Image.Image:
     w, h = img.size
     if w > out_width:
-        nh = int(h * (out_width / w))
+        nh = max(1, int(h * (out_width / w)))
         img = img.resize((out_width, nh), Image.LANCZOS)
         mask = mask.resize((out_width, nh), Image.LANCZOS)
+    out = img.convert("RGBA")
+    out.putalpha(mask)
+    return out
+
+
+def cursor_css(files: List[Tuple[int, str, str | None, Tuple[int, int]]], css_size: int) -> str:
+    """.snail-cursor rules: the base size plus one modifier class per other size."""
+    lines = ["/* Generated by tools/make_snail_cursor.py */"]
+    for width, one_x, two_x, (w, h) in files:
+        sel = ".snail-cursor" if width == css_size else f".snail-cursor.snail-{width}"
+        sets = f"url('{one_x}') 1x" + (f", url('{two_x}') 2x" if two_x else "")
+        lines.append(f"{sel} {{ width: {w}px; height: {h}px; "
+                     f"background-image: url('{one_x}'); "
+                     f"background-image: -webkit-image-set({sets}); "
+                     f"background-image: image-set({sets}); }}")
+    return "\n".join(lines) + "\n"
 
-    # Apply alpha and save
-    img = img.convert("RGBA")
-    img.putalpha(mask)
 
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    img.save(output_path, format="PNG")
-    print(f"Snail cursor saved → {output_path} ({img.size[0]}x{img.size[1]})")
+def inline_css(stylesheet: str, css: str) -> bool:
+    """Put (or refresh) the rules at the end of ``stylesheet``; returns True when it changed."""
+    with open(stylesheet, encoding="utf-8") as f:
+        text = f.read()
+    block = f"{CSS_START}\n{css.strip()}\n{CSS_END}"
+    if CSS_START in text and CSS_END in text:
+        new = re.sub(re.escape(CSS_START) + r".*?" + re.escape(CSS_END), lambda _: block, text,
+                     count=1, flags=re.S)
+    else:
+        new = text.rstrip("\n") + "\n\n" + block + "\n"
+    if new != text:
+        with open(stylesheet, "w", encoding="utf-8") as f:
+            f.write(new)
+    return new != text
+
+
+def make_cursor(input_path: str, output_path: str, out_width: int = 96,
+                sizes: List[int] | None = None, css_size: int = CSS_SIZE, stylesheet: str | None = None):
+    sizes = sorted(set(sizes or SIZES) | {out_width, css_size})
+    img, mask = load_subject(input_path, max(sizes) * 2)
+    out_dir = os.path.dirname(output_path) or "."
+    stem, _ = os.path.splitext(os.path.basename(output_path))
+    os.makedirs(out_dir, exist_ok=True)
+
+    # Legacy single file, still the default for pages that reference it directly
+    base = render(img, mask, out_width)
+    base.save(output_path, format="PNG", optimize=True)
+    print(f"Snail cursor saved → {output_path} ({base.size[0]}x{base.size[1]})")
+
+    files = []
+    for width in sizes:
+        one = render(img, mask, width)
+        one_name = f"{stem}-{width}.png"
+        one.save(os.path.join(out_dir, one_name), format="PNG", optimize=True)
+        two_name = None
+        if img.size[0] >= width * 2:
+            two_name = f"{stem}-{width}@2x.png"
+            render(img, mask, width * 2).save(os.path.join(out_dir, two_name), format="PNG", optimize=True)
+        else:
+            print(f"  {width}px: subject is only {img.size[0]}px wide, no @2x")
+        files.append((width, one_name, two_name, one.size))
+        print(f"  {one_name} ({one.size[0]}x{one.size[1]})" + (f" + {two_name}" if two_name else ""))
+
+    if stylesheet:
+        base_dir = os.path.dirname(stylesheet) or "."
+        rel = lambda name: name and os.path.relpath(os.path.join(out_dir, name), base_dir).replace(os.sep, "/")
+        css = cursor_css([(w, rel(one), rel(two), size) for w, one, two, size in files], css_size)
+        changed = inline_css(stylesheet, css)
+        print(f"Cursor rules {'written to' if changed else 'already up to date in'} {stylesheet}")
+        return
+    css_path = os.path.join(out_dir, f"{stem}.css")
+    with open(css_path, "w", encoding="utf-8") as f:
+        f.write(cursor_css(files, css_size))
+    print(f"CSS snippet saved → {css_path} (paths are relative to {out_dir}/)")
+
+
+def check(input_path: str) -> bool:
+    img = load_image(input_path, ANALYSIS * 4, "RGB")
+    same = raw_mask(img).tobytes() == _reference_mask(img).tobytes()
+    print(f"{'✓' if same else '✗'} {input_path} ({img.size[0]}x{img.size[1]}): "
+          f"vectorized mask {'matches' if same else 'differs from'} the per-pixel loop")
+    return same
 
 
 def main():
-    input_path = sys.argv[1] if len(sys.argv) > 1 else (find_default_input() or "")
+    ap = argparse.ArgumentParser(description="Cut a parchment-background image into a set of cursor PNGs.")
+    ap.add_argument("input", nargs="?", default=None)
+    ap.add_argument("output", nargs="?", default="assets/icons/snail-cursor.png")
+    ap.add_argument("--sizes", default=",".join(map(str, SIZES)), help="cursor widths in CSS pixels")
+    ap.add_argument("--css-size", type=int, default=CSS_SIZE, help="width the base .snail-cursor rule uses")
+    ap.add_argument("--stylesheet", default=None, help="write the rules into this CSS file instead of <stem>.css")
+    ap.add_argument("--check", action="store_true", help="compare the mask with the original per-pixel loop")
+    args = ap.parse_args()
+
+    input_path = args.input or find_default_input() or ""
     if not input_path or not os.path.exists(input_path):
         print("Input image not found. Place your photo at assets/icons/snail-source.png (or .jpg/.webp) or pass a path.")
         sys.exit(1)
-    output_path = sys.argv[2] if len(sys.argv) > 2 else "assets/icons/snail-cursor.png"
-    make_cursor(input_path, output_path)
+    if args.check:
+        sys.exit(0 if check(input_path) else 1)
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    make_cursor(input_path, args.output, sizes=sizes, css_size=args.css_size, stylesheet=args.stylesheet)
 
 
 if __name__ == "__main__":
     main()
-
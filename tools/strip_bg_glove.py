@@ -1,76 +1,186 @@
 #!/usr/bin/env python3
 """
-Quick-and-simple background stripper for the blue glove PNG.
+Quick-and-simple background stripper (chroma key) for the blue glove PNG and friends.
 It converts near-cream/light background pixels to transparent while keeping blue tones.
 
 Usage:
   python3 tools/strip_bg_glove.py assets/icons/home.png
+  python3 tools/strip_bg_glove.py icons/*.png --out build/keyed --workers 4
+  python3 tools/strip_bg_glove.py scan.png --per-corner          # uneven/gradient paper
+  python3 tools/strip_bg_glove.py scan.png --bg "#f4ecd8,#ffffff"
+  python3 tools/strip_bg_glove.py assets/icons/home.png --check  # compare with the old loop
 
-Writes in-place (overwrites the input file). Keep a backup if needed.
+Writes in-place (overwrites the input file) unless --out is given. Keep a backup if needed.
+With --out, two inputs with the same file name are rejected before anything runs.
+
+The background color is the per-channel median of the four 10x10 corner blocks (or one
+color per corner with --per-corner, or explicit --bg colors). Alpha ramps linearly from 0
+within --hard to 255 beyond --soft (RGB distance to the nearest background color), all
+as NumPy array operations. Files are processed concurrently. Also available as the
+"chroma-key" operation in asset_pipeline.py / assets.toml.
 """
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from PIL import Image, ImageFilter
+import argparse
+import numpy as np
+import os
 import statistics
 import sys
 
+from image_io import load_image
+
+def _corner_blocks(rgb: np.ndarray, pad: int = 10) -> list:
+    h, w = rgb.shape[:2]
+    return [rgb[sy:sy + pad, sx:sx + pad].reshape(-1, 3)
+            for sx, sy in [(0, 0), (max(w - pad, 0), 0), (0, max(h - pad, 0)), (max(w - pad, 0), max(h - pad, 0))]]
+
 def corner_bg_color(img: Image.Image, pad: int = 10) -> tuple[int,int,int]:
+    rgb = np.asarray(img.convert('RGB'))
+    # median per channel is robust to noise
+    med = np.median(np.concatenate(_corner_blocks(rgb, pad)), axis=0)
+    return tuple(int(c) for c in med)
+
+def corner_bg_colors(img: Image.Image, pad: int = 10) -> list:
+    """One median color per corner, for backgrounds that aren't a single flat color."""
+    rgb = np.asarray(img.convert('RGB'))
+    return [tuple(int(c) for c in np.median(block, axis=0)) for block in _corner_blocks(rgb, pad)]
+
+def parse_colors(spec: str) -> list:
+    """'#f4ecd8,255 255 255' -> [(244, 236, 216), (255, 255, 255)]"""
+    colors = []
+    for part in spec.split(','):
+        part = part.strip().lstrip('#')
+        if len(part) == 6 and all(c in '0123456789abcdefABCDEF' for c in part):
+            colors.append(tuple(int(part[i:i + 2], 16) for i in (0, 2, 4)))
+        elif part:
+            colors.append(tuple(int(v) for v in part.split()))
+    return colors
+
+def key_alpha(rgba: np.ndarray, colors, hard: int = 55, soft: int = 95) -> np.ndarray:
+    """Alpha (uint8) from the squared RGB distance to the nearest background color."""
+    rgb = rgba[:, :, :3].astype(np.int32)
+    d2 = None
+    for color in colors:
+        diff = rgb - np.asarray(color, dtype=np.int32)
+        dist = np.einsum('ijk,ijk->ij', diff, diff)
+        d2 = dist if d2 is None else np.minimum(d2, dist, out=d2)
+    hard2, soft2 = hard * hard, soft * soft
+    # linearly ramp alpha between hard and soft thresholds (truncated like int(255 * t))
+    t = (d2 - hard2) / (soft2 - hard2)
+    alpha = (255 * np.clip(t, 0.0, 1.0)).astype(np.uint8)
+    alpha[rgba[:, :, 3] < 12] = 0
+    return alpha
+
+def strip_bg_image(img: Image.Image, hard: int = 55, soft: int = 95, bg=None,
+                   per_corner: bool = False) -> Image.Image:
+    """Return an RGBA copy with the background color(s) keyed out.
+
+    Pixels within ``hard`` (RGB distance) of the background are transparent, beyond
+    ``soft`` fully opaque, with a linear alpha ramp in between. ``bg`` is a list of
+    colors (or a "#rrggbb,..." string); by default the corner median is used, or each
+    corner's own median with ``per_corner``.
+    """
+    img = img.convert('RGBA')
+    if isinstance(bg, str):
+        bg = parse_colors(bg)
+    colors = bg or (corner_bg_colors(img) if per_corner else [corner_bg_color(img)])
+    alpha = key_alpha(np.asarray(img), colors, hard, soft)
+    mask = Image.fromarray(alpha, 'L')
+    mask = mask.filter(ImageFilter.MedianFilter(3)).filter(ImageFilter.GaussianBlur(0.8))
+    out = Image.new('RGBA', img.size, (0,0,0,0))
+    out.paste(img, (0,0), mask)
+    return out
+
+def _reference_alpha(img: Image.Image, hard: int = 55, soft: int = 95) -> Image.Image:
+    """The original per-pixel implementation, kept for --check."""
+    img = img.convert('RGBA')
+    w, h = img.size
+    px = img.load()
     rgb = img.convert('RGB')
-    w, h = rgb.size
+    pad = 10
     samples = []
     for (sx, sy) in [(0,0), (w-pad,0), (0,h-pad), (w-pad,h-pad)]:
         for y in range(sy, min(sy+pad, h)):
             for x in range(sx, min(sx+pad, w)):
                 samples.append(rgb.getpixel((x,y)))
-    # median per channel is robust to noise
-    r = statistics.median(c[0] for c in samples)
-    g = statistics.median(c[1] for c in samples)
-    b = statistics.median(c[2] for c in samples)
-    return int(r), int(g), int(b)
-
-def strip_bg(path: Path) -> None:
-    img = Image.open(path).convert('RGBA')
-    w, h = img.size
-    px = img.load()
-    bg_r, bg_g, bg_b = corner_bg_color(img)
-    # Build alpha mask by distance to background color; fade edges softly
+    bg_r, bg_g, bg_b = (int(statistics.median(c[i] for c in samples)) for i in range(3))
     mask = Image.new('L', (w, h), 255)
     m = mask.load()
-    def dist2(r,g,b):
-        dr = r-bg_r; dg = g-bg_g; db = b-bg_b
-        return dr*dr + dg*dg + db*db
-    # thresholds tuned for cream→transparent while preserving blue
-    hard = 55**2   # fully transparent if within this distance
-    soft = 95**2   # start of fully opaque region beyond this
+    hard = hard**2
+    soft = soft**2
     for y in range(h):
         for x in range(w):
             r,g,b,a = px[x,y]
             if a < 12:
                 m[x,y] = 0
                 continue
-            d2 = dist2(r,g,b)
+            d2 = (r-bg_r)**2 + (g-bg_g)**2 + (b-bg_b)**2
             if d2 <= hard:
                 m[x,y] = 0
             elif d2 >= soft:
                 m[x,y] = 255
             else:
-                # linearly ramp alpha between hard and soft thresholds
                 t = (d2 - hard) / (soft - hard)
                 m[x,y] = int(255 * t)
-    mask = mask.filter(ImageFilter.MedianFilter(3)).filter(ImageFilter.GaussianBlur(0.8))
-    out = Image.new('RGBA', (w,h), (0,0,0,0))
-    out.paste(img, (0,0), mask)
-    out.save(path)
-    print(f"Updated {path} with transparent background")
+    return mask
+
+def strip_bg(path: Path, out: Path | None = None, **params) -> Path:
+    dest = out or path
+    result = strip_bg_image(load_image(path, mode='RGBA'), **params)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    result.save(dest)
+    return dest
+
+def check(path: Path, hard: int, soft: int) -> bool:
+    img = load_image(path, mode='RGBA')
+    fast = key_alpha(np.asarray(img), [corner_bg_color(img)], hard, soft)
+    ref = np.asarray(_reference_alpha(img, hard, soft))
+    same = np.array_equal(fast, ref)
+    print(f"{'✓' if same else '✗'} {path}: vectorized alpha {'matches' if same else 'differs from'} the per-pixel loop")
+    return same
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python3 tools/strip_bg_glove.py assets/icons/home.png")
-        sys.exit(1)
-    p = Path(sys.argv[1])
-    if not p.exists():
+    ap = argparse.ArgumentParser(description="Key out light/flat backgrounds to transparency.")
+    ap.add_argument('files', nargs='+', type=Path)
+    ap.add_argument('--hard', type=int, default=55, help='RGB distance that is fully transparent')
+    ap.add_argument('--soft', type=int, default=95, help='RGB distance that is fully opaque')
+    ap.add_argument('--bg', default=None, help='explicit background colors, e.g. "#f4ecd8,#ffffff"')
+    ap.add_argument('--per-corner', action='store_true', help='key against each corner color separately')
+    ap.add_argument('--out', type=Path, default=None, help='write here instead of overwriting the inputs')
+    ap.add_argument('--workers', type=int, default=None)
+    ap.add_argument('--check', action='store_true', help='compare with the original per-pixel loop')
+    args = ap.parse_args()
+
+    missing = [p for p in args.files if not p.exists()]
+    for p in missing:
         print(f"File not found: {p}")
+    files = [p for p in args.files if p.exists()]
+    if not files:
+        sys.exit(2)
+    if args.check:
+        sys.exit(0 if all([check(p, args.hard, args.soft) for p in files]) else 1)
+
+    params = {'hard': args.hard, 'soft': args.soft, 'per_corner': args.per_corner,
+              'bg': parse_colors(args.bg) if args.bg else None}
+    outs = [args.out / p.name if args.out else None for p in files]
+    if args.out:
+        # Inputs from different folders can share a name; don't let the workers race on it
+        claimed = {}
+        for p in files:
+            other = claimed.setdefault(p.name.casefold(), p)
+            if other is not p:
+                sys.exit(f"{other} and {p} would both be written to {args.out / p.name}; "
+                         "run them separately")
+    with ProcessPoolExecutor(max_workers=min(len(files), args.workers or os.cpu_count() or 1)) as pool:
+        futures = [(p, pool.submit(strip_bg, p, o, **params)) for p, o in zip(files, outs)]
+        for p, fut in futures:
+            try:
+                print(f"Updated {fut.result()} with transparent background")
+            except Exception as e:
+                print(f"✗ {p}: {e}")
+    if missing:
         sys.exit(2)
-    strip_bg(p)
 
 if __name__ == '__main__':
     main()
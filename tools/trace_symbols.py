@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Trace the landing symbols into small SVGs and an inline SVG sprite.
+
+Usage:
+  python3 tools/trace_symbols.py                       # assets/img/symbols/*.png -> .svg + symbols.svg
+  python3 tools/trace_symbols.py --levels 3 --epsilon 0.8
+  python3 tools/trace_symbols.py --inline index.html   # also (re)embed the sprite in a page
+
+Per symbol:
+  1) Silhouette: the PNG's own alpha when it has one, otherwise the light background is
+     removed with bg_mask.clean_background (the extractors' step), giving a soft mask.
+  2) Marching squares on the mask at 50% coverage, all cells classified at once in NumPy;
+     the crossings are interpolated, so contours are sub-pixel accurate.
+  3) Ramer-Douglas-Peucker simplification (--epsilon, in pixels) of each closed contour.
+  4) Filled with the subject's average color; --levels N adds N-1 darker tone layers
+     (luminance quantiles of the subject) traced the same way, for some interior detail.
+
+Output (next to the PNGs):
+  <name>.svg    standalone, relative path commands, 1 decimal, fill-rule evenodd
+  symbols.svg   <svg> sprite of <symbol id="sym-<name>" fill-rule="evenodd">, used as
+                <svg class="symbol-img"><use href="#sym-about"/></svg> once inlined
+                (the fill rule sits on each <symbol>: a <use> inherits from itself, not
+                from the sprite's root)
+--inline PAGE puts the sprite right after <body>, between <!-- symbols:start/end -->
+markers, replacing any previous copy, so the page needs no image requests for them.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+import bg_mask
+from image_io import load_image
+
+ROOT = Path(__file__).resolve().parents[1]
+SYMBOLS = ROOT / "assets" / "img" / "symbols"
+MAX_SIZE = 512  # trace resolution, as extract_symbols5.py
+EPSILON = 0.6
+MIN_AREA = 12.0  # px^2; smaller specks are dropped
+SPRITE_START = "<!-- symbols:start -->"
+SPRITE_END = "<!-- symbols:end -->"
+
+# Marching-squares segments per cell case (corner bits tl=8, tr=4, br=2, bl=1), as pairs
+# of cell edges: 0 top, 1 right, 2 bottom, 3 left. Saddles (5, 10) are resolved below.
+CASES: Dict[int, List[Tuple[int, int]]] = {
+    1: [(3, 2)], 2: [(2, 1)], 3: [(3, 1)], 4: [(0, 1)], 6: [(0, 2)], 7: [(0, 3)],
+    8: [(0, 3)], 9: [(0, 2)], 11: [(0, 1)], 12: [(3, 1)], 13: [(2, 1)], 14: [(3, 2)],
+}
+SADDLES = {  # case: (segments if the cell centre is inside, segments if outside)
+    5: ([(3, 0), (2, 1)], [(0, 1), (3, 2)]),
+    10: ([(0, 1), (3, 2)], [(0, 3), (2, 1)]),
+}
+
+
+def silhouette(img: Image.Image) -> np.ndarray:
+    """Soft subject mask in [0, 1]."""
+    if img.mode == "RGBA" and img.getextrema()[3][0] < 255:
+        alpha = img.getchannel("A")
+    else:
+        alpha = bg_mask.clean_background(img, blur=1.2).getchannel("A")
+    return np.asarray(alpha, dtype=np.float64) / 255.0
+
+
+def marching_squares(field: np.ndarray, level: float = 0.5) -> List[np.ndarray]:
+    """Closed iso-contours of ``field`` as (N, 2) arrays of x, y (pixel centres at +0.5)."""
+    f = np.pad(field, 1)  # zero border: every contour closes
+    h, w = f.shape
+    inside = f > level
+    case = (inside[:-1, :-1] * 8 | inside[:-1, 1:] * 4 | inside[1:, 1:] * 2 | inside[1:, :-1] * 1)
+
+    # Crossing ids: horizontal grid edge (i, j)-(i, j+1) -> 2*(i*w+j), vertical (i, j)-(i+1, j) -> +1.
+    def edge_ids(ci: np.ndarray, cj: np.ndarray, side: int) -> np.ndarray:
+        i = ci + (side == 2)
+        j = cj + (side == 1)
+        return 2 * (i * w + j) + (side in (1, 3))
+
+    neighbours: Dict[int, List[int]] = {}
+
+    def add(ci: np.ndarray, cj: np.ndarray, a: int, b: int) -> None:
+        for p, q in zip(edge_ids(ci, cj, a).tolist(), edge_ids(ci, cj, b).tolist()):
+            neighbours.setdefault(p, []).append(q)
+            neighbours.setdefault(q, []).append(p)
+
+    for c, segs in CASES.items():
+        ci, cj = np.nonzero(case == c)
+        for a, b in segs:
+            add(ci, cj, a, b)
+    for c, (joined, split) in SADDLES.items():
+        ci, cj = np.nonzero(case == c)
+        centre = (f[ci, cj] + f[ci, cj + 1] + f[ci + 1, cj] + f[ci + 1, cj + 1]) / 4 > level
+        for sel, segs in ((centre, joined), (~centre, split)):
+            for a, b in segs:
+                add(ci[sel], cj[sel], a, b)
+
+    def point(eid: int) -> Tuple[float, float]:
+        cell, vertical = divmod(eid, 2)
+        i, j = divmod(cell, w)
+        a = f[i, j]
+        b = f[i + 1, j] if vertical else f[i, j + 1]
+        t = (level - a) / (b - a)
+        x, y = (j, i + t) if vertical else (j + t, i)
+        return x - 0.5, y - 0.5  # undo the pad, then pixel centres sit at +0.5
+
+    loops = []
+    while neighbours:
+        start = next(iter(neighbours))
+        loop = [start]
+        prev, cur = start, neighbours[start][0]
+        while cur != start:
+            loop.append(cur)
+            nxt = neighbours[cur]
+            prev, cur = cur, (nxt[1] if nxt[0] == prev else nxt[0])
+        for e in loop:
+            neighbours.pop(e, None)
+        loops.append(np.array([point(e) for e in loop]))
+    return loops
+
+
+def _rdp(pts: np.ndarray, epsilon: float) -> np.ndarray:
+    """Ramer-Douglas-Peucker on an open polyline (iterative, first/last kept)."""
+    keep = np.zeros(len(pts), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(pts) - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        seg = pts[b] - pts[a]
+        rel = pts[a + 1:b] - pts[a]
+        norm = np.hypot(*seg)
+        d = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / norm if norm else np.hypot(rel[:, 0], rel[:, 1])
+        k = int(np.argmax(d))
+        if d[k] > epsilon:
+            m = a + 1 + k
+            keep[m] = True
+            stack += [(a, m), (m, b)]
+    return pts[keep]
+
+
+def simplify(loop: np.ndarray, epsilon: float = EPSILON) -> np.ndarray:
+    """RDP for a closed contour: split at the point farthest from the first one."""
+    far = int(np.argmax(np.hypot(*(loop - loop[0]).T)))
+    if far == 0:
+        return loop[:1]
+    a = _rdp(loop[:far + 1], epsilon)
+    b = _rdp(np.vstack([loop[far:], loop[:1]]), epsilon)
+    return np.vstack([a, b[1:-1]])
+
+
+def _area(loop: np.ndarray) -> float:
+    x, y = loop[:, 0], loop[:, 1]
+    return 0.5 * abs(float(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))))
+
+
+def _num(v: float) -> str:
+    s = f"{v:.1f}".rstrip("0").rstrip(".")
+    if s in ("-0", ""):
+        s = "0"
+    return s.replace("0.", ".", 1) if s.startswith(("0.", "-0.")) else s
+
+
+def _join(nums: List[str]) -> str:
+    """Numbers with only the separators SVG needs ("1.5.5" is 1.5 .5, "-" starts a number)."""
+    s = nums[0]
+    for prev, n in zip(nums, nums[1:]):
+        s += n if n[0] == "-" or (n[0] == "." and "." in prev) else " " + n
+    return s
+
+
+def path_data(loops: List[np.ndarray]) -> str:
+    """Compact path: absolute M per contour, then relative l, numbers at 1 decimal."""
+    out = []
+    for loop in loops:
+        q = np.round(loop, 1)
+        d = np.round(np.diff(q, axis=0), 1)
+        out.append(f"M{_join([_num(v) for v in q[0]])}l{_join([_num(v) for v in d.ravel()])}z")
+    return "".join(out)
+
+
+def trace_layers(img: Image.Image, levels: int = 1, epsilon: float = EPSILON) -> List[Tuple[str, str]]:
+    """[(fill color, path data)], lightest (the silhouette) first."""
+    mask = silhouette(img)
+    rgb = np.asarray(img.convert("RGB"), dtype=np.float64)
+    solid = mask > 0.5
+    if not solid.any():
+        return []
+    lum = rgb @ np.array([0.299, 0.587, 0.114])
+    layers = []
+    thresholds = [None] + [float(np.quantile(lum[solid], 1 - k / levels)) for k in range(1, levels)]
+    for t in thresholds:
+        if t is None:
+            field, sel = mask, solid
+        else:
+            sel = solid & (lum <= t)
+            layer = Image.fromarray((sel * 255).astype(np.uint8), "L").filter(ImageFilter.GaussianBlur(1.0))
+            field = np.asarray(layer, dtype=np.float64) / 255.0 * mask
+        if not sel.any():
+            continue
+        loops = [simplify(lp, epsilon) for lp in marching_squares(field)]
+        loops = [lp for lp in loops if len(lp) >= 3 and _area(lp) >= MIN_AREA]
+        if loops:
+            color = "#%02x%02x%02x" % tuple(int(c) for c in rgb[sel].mean(axis=0))
+            layers.append((color, path_data(loops)))
+    return layers
+
+
+def _paths(layers: List[Tuple[str, str]]) -> str:
+    return "".join(f'<path fill="{c}" d="{d}"/>' for c, d in layers)
+
+
+def standalone_svg(layers: List[Tuple[str, str]], size: Tuple[int, int]) -> str:
+    w, h = size
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {w} {h}" fill-rule="evenodd">'
+            f'{_paths(layers)}</svg>\n')
+
+
+def sprite_svg(symbols: Dict[str, Tuple[List[Tuple[str, str]], Tuple[int, int]]]) -> str:
+    body = "".join(f'<symbol id="sym-{name}" viewBox="0 0 {w} {h}" fill-rule="evenodd">'
+                   f'{_paths(layers)}</symbol>'
+                   for name, (layers, (w, h)) in symbols.items())
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" aria-hidden="true" '
+            f'style="position:absolute;width:0;height:0;overflow:hidden">{body}</svg>\n')
+
+
+def inline_sprite(page: Path, sprite: str) -> bool:
+    """Embed (or refresh) the sprite right after <body>; returns True when the page changed."""
+    html = page.read_text(encoding="utf-8")
+    block = f"{SPRITE_START}{sprite.strip()}{SPRITE_END}"
+    if SPRITE_START in html and SPRITE_END in html:
+        new = re.sub(re.escape(SPRITE_START) + r".*?" + re.escape(SPRITE_END), lambda _: block, html,
+                     count=1, flags=re.S)
+    else:
+        new = re.sub(r"(<body[^>]*>)", lambda m: m.group(1) + "\n    " + block, html, count=1)
+    if new != html:
+        page.write_text(new, encoding="utf-8")
+    return new != html
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Trace the landing symbol PNGs into SVG paths and a sprite.")
+    ap.add_argument("images", nargs="*", type=Path, help="default: assets/img/symbols/*.png")
+    ap.add_argument("--out", type=Path, default=None, help="output directory (default: next to the PNGs)")
+    ap.add_argument("--max-size", type=int, default=MAX_SIZE, help="trace resolution (longest side)")
+    ap.add_argument("--epsilon", type=float, default=EPSILON, help="RDP tolerance in traced pixels")
+    ap.add_argument("--levels", type=int, default=1, help="tone layers per symbol (1 = silhouette only)")
+    ap.add_argument("--inline", type=Path, action="append", default=[], help="page to embed the sprite in")
+    args = ap.parse_args()
+
+    images = args.images or sorted(SYMBOLS.glob("*.png"))
+    if not images:
+        print(f"No symbol PNGs found in {SYMBOLS}")
+        return
+    out_dir = args.out or images[0].parent
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    symbols: Dict[str, Tuple[List[Tuple[str, str]], Tuple[int, int]]] = {}
+    png_bytes = svg_bytes = 0
+    for path in images:
+        img = load_image(path, args.max_size)
+        if max(img.size) > args.max_size:
+            img.thumbnail((args.max_size, args.max_size), Image.LANCZOS)
+        layers = trace_layers(img, max(1, args.levels), args.epsilon)
+        if not layers:
+            print(f"✗ {path.name}: no subject found")
+            continue
+        svg = standalone_svg(layers, img.size)
+        (out_dir / f"{path.stem}.svg").write_text(svg, encoding="utf-8")
+        symbols[path.stem] = (layers, img.size)
+        png_bytes += path.stat().st_size
+        svg_bytes += len(svg.encode())
+        print(f"✓ {path.name} -> {path.stem}.svg ({len(svg) / 1024:.1f} KB, {len(layers)} layer(s))")
+
+    sprite = sprite_svg(symbols)
+    (out_dir / "symbols.svg").write_text(sprite, encoding="utf-8")
+    print(f"Sprite: {out_dir / 'symbols.svg'} ({len(sprite) / 1024:.1f} KB for {len(symbols)} symbol(s); "
+          f"PNGs were {png_bytes / 1024:.0f} KB, SVGs {svg_bytes / 1024:.1f} KB)")
+    for page in args.inline:
+        print(f"{'Inlined sprite in' if inline_sprite(page, sprite) else 'Sprite already current in'} {page}")
+
+
+if __name__ == "__main__":
+    main()